@@ -1,19 +1,261 @@
+import asyncio
+import hashlib
+import logging
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
+from cache import ResponseCache, LRUCache, SQLiteCache
+from batcher import RequestBatcher
+from singleflight import SingleFlight
+from ratelimit import RateLimiter, AdaptiveLimiter
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# 各接口的超时时间 (连接超时, 读取超时)，单位秒
+DEFAULT_TIMEOUTS = {
+    "default": (3.05, 10),
+    "/login/qr/check": (3.05, 5),
+    "/playlist/track/all": (3.05, 30),
+}
+
+# 可缓存接口的有效期，单位秒；不在表中的接口不缓存
+DEFAULT_CACHE_TTLS = {
+    "/song/detail": 7 * 24 * 3600,
+    "/lyric": 7 * 24 * 3600,
+    "/playlist/detail": 10 * 60,
+    "/playlist/track/all": 10 * 60,
+}
+
+# 各类接口的限速 (每秒请求数, 突发容量)
+DEFAULT_RATE_LIMITS = {
+    "login": (5, 10),
+    "media": (20, 40),
+    "default": (50, 100),
+}
+
+# 服务器过载或限流时返回的HTTP状态码
+OVERLOAD_STATUS = {405, 429, 500, 502, 503, 504}
+# GET请求遇到这些状态码时退避重试
+RETRY_STATUS = {500, 502, 503, 504}
+
+def endpoint_category(path):
+    """接口所属的限速类别"""
+    if path.startswith("/login"):
+        return "login"
+    if path == "/song/url":
+        return "media"
+    return "default"
+
+# 批量接口单次请求的最大id数
+SONG_DETAIL_CHUNK = 500
+SONG_URL_CHUNK = 200
+# 分页获取歌单歌曲时每页的数量
+TRACK_PAGE_SIZE = 500
+# 分页获取用户歌单时每页的数量
+USER_PLAYLIST_PAGE_SIZE = 100
+
+def create_default_cache():
+    """默认缓存：内存LRU + 磁盘SQLite"""
+    return ResponseCache(LRUCache(max_entries=512), SQLiteCache())
 
 class NetEaseAPI:
-    def __init__(self):
-        self.base_url = "http://localhost:3000"  # 网易云API地址
+    def __init__(self, base_url="http://localhost:3000", pool_size=10,
+                 timeouts=None, retries=3, backoff_factor=0.3,
+                 cache=None, cache_ttls=None, coalesce_window=0.01,
+                 rate_limits=None, max_concurrency=None, metrics=None):
+        self.base_url = base_url  # 网易云API地址
         self.cookie = None  # 添加cookie属性
         self.user_id = None  # 添加用户ID属性
         self.headers = {}    # 添加请求头
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.pool_size = pool_size
+        self.metrics = metrics or REGISTRY  # 接口调用统计
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.session = self._create_session(pool_size)
+        # cache=False 关闭缓存，None 使用默认的两级缓存
+        self.cache = create_default_cache() if cache is None else (cache or None)
+        self.cache_ttls = dict(DEFAULT_CACHE_TTLS)
+        if cache_ttls:
+            self.cache_ttls.update(cache_ttls)
+        # 按接口类别限速，并发上限根据延迟和错误自适应调整
+        rates = dict(DEFAULT_RATE_LIMITS)
+        if rate_limits:
+            rates.update(rate_limits)
+        self.limiter = RateLimiter(rates, AdaptiveLimiter(
+            initial=min(4, pool_size),
+            max_limit=max_concurrency or pool_size
+        ))
+        # 相同的GET请求同一时刻只发一次
+        self._inflight = SingleFlight()
+        # 合并短时间内并发的单曲请求
+        self._detail_batcher = RequestBatcher(self._fetch_song_details, coalesce_window, SONG_DETAIL_CHUNK)
+        self._url_batcher = RequestBatcher(self._fetch_song_urls, coalesce_window, SONG_URL_CHUNK)
+
+    def _create_session(self, pool_size):
+        """创建带连接池的会话，重试由 _request 负责"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _request(self, method, path, **kwargs):
+        """通过连接池发送请求，受限速和并发控制
+
+        幂等的GET请求遇到5xx或连接错误时指数退避重试，每次尝试都重新取令牌和并发名额，
+        限流器能看到每一次真实的请求。
+        """
+        kwargs.setdefault("timeout", self.timeouts.get(path, self.timeouts["default"]))
+        retries = self.retries if method == "GET" else 0
+        for attempt in range(retries + 1):
+            try:
+                response = self._attempt(method, path, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS or attempt >= retries:
+                    return response
+                response.close()
+            time.sleep(self.backoff_factor * (2 ** attempt))
+
+    def _attempt(self, method, path, **kwargs):
+        """发送一次请求，记录延迟并反馈给限流器"""
+        self.limiter.acquire(endpoint_category(path))
+        start = time.monotonic()
+        ok = False
+        status = None
+        nbytes = 0
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            status = response.status_code
+            nbytes = len(response.content)
+            ok = status not in OVERLOAD_STATUS
+            return response
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            latency = time.monotonic() - start
+            self.limiter.release(latency, ok)
+            self.metrics.record_request(path, latency, status, nbytes)
+            logger.debug("%s %s -> %s in %.1f ms", method, path, status, latency * 1000)
+
+    def _cache_key(self, path, params, headers=None):
+        """缓存和请求合并的键：接口、参数和账号
+
+        同一接口不同账号的返回不同（如私人歌单），键中带上cookie的摘要，
+        磁盘缓存中不保存cookie原文。
+        """
+        items = sorted((k, str(v)) for k, v in (params or {}).items())
+        key = path + "?" + "&".join(f"{k}={v}" for k, v in items)
+        cookie = (headers or {}).get("Cookie")
+        if cookie:
+            key += "#" + hashlib.sha1(cookie.encode("utf-8")).hexdigest()[:16]
+        return key
+
+    def _get_cached(self, path, params, headers=None, use_memory=True):
+        """读取缓存，接口不可缓存或未命中时返回None；use_memory=False 时只读磁盘"""
+        if not self.cache or not self.cache_ttls.get(path):
+            return None
+        key = self._cache_key(path, params, headers)
+        if use_memory:
+            result = self.cache.get(key)
+        else:
+            result = self.cache.get_many([key], use_memory=False).get(key)
+        if result is not None:
+            self.metrics.record_cache_hit(path)
+        return result
+
+    def _set_cached(self, path, params, result, headers=None, use_memory=True):
+        ttl = self.cache_ttls.get(path)
+        if self.cache and ttl and result.get("code") == 200:
+            key = self._cache_key(path, params, headers)
+            if use_memory:
+                self.cache.set(key, result, ttl)
+            else:
+                self.cache.set_many({key: result}, ttl, use_memory=False)
+
+    def _get_cached_songs(self, song_ids):
+        """批量读取单曲详情缓存，返回 {id: 单曲详情响应}
+
+        单曲条目数量很多，只存磁盘，不进内存LRU，以免挤掉歌单、歌词等条目。
+        """
+        if not self.cache or not self.cache_ttls.get("/song/detail"):
+            return {}
+        keys = {self._cache_key("/song/detail", {"ids": song_id}, self.headers): song_id
+                for song_id in song_ids}
+        cached = self.cache.get_many(list(keys), use_memory=False)
+        if cached:
+            self.metrics.record_cache_hit("/song/detail", len(cached))
+        return {keys[key]: value for key, value in cached.items()}
+
+    def _set_cached_songs(self, songs):
+        """在一个事务中缓存 {id: 单曲详情响应}"""
+        ttl = self.cache_ttls.get("/song/detail")
+        if self.cache and ttl and songs:
+            self.cache.set_many(
+                {self._cache_key("/song/detail", {"ids": song_id}, self.headers): single
+                 for song_id, single in songs.items()},
+                ttl,
+                use_memory=False
+            )
+
+    def _get(self, path, params=None, headers=None, use_cache=True, use_memory=True):
+        """发送GET请求并解析JSON，可缓存的接口优先读取缓存
+
+        并发的相同请求（接口、参数和cookie都相同）只会发出一次，
+        所有调用方拿到同一个结果对象，不要原地修改。
+        use_memory=False 时结果只缓存在磁盘，用于体积大的响应。
+        """
+        if use_cache:
+            cached = self._get_cached(path, params, headers, use_memory)
+            if cached is not None:
+                return cached
+
+        def fetch():
+            response = self._request("GET", path, params=params, headers=headers)
+            result = response.json()
+            if result.get("code") != 200:
+                self.metrics.record_error_code(path, result.get("code"))
+            if use_cache:
+                self._set_cached(path, params, result, headers, use_memory)
+            return result
+
+        return self._inflight.do(self._cache_key(path, params, headers), fetch)
+
+    def stats(self):
+        """返回缓存命中、请求合并等统计"""
+        return {
+            "cache": self.cache.stats() if self.cache else {},
+            "singleflight": self._inflight.stats(),
+            "limiter": self.limiter.stats(),
+            "endpoints": self.metrics.snapshot(),
+            "batching": {
+                "detail_requests": self._detail_batcher.requests,
+                "detail_batches": self._detail_batcher.batches,
+                "url_requests": self._url_batcher.requests,
+                "url_batches": self._url_batcher.batches
+            }
+        }
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
 
     def login(self, phone, password):
         """手机号登录接口"""
         try:
             timestamp = str(int(time.time() * 1000))
-            response = requests.post(
-                f"{self.base_url}/login/cellphone", 
+            response = self._request(
+                "POST",
+                "/login/cellphone",
                 data={
                     "phone": phone,
                     "password": password,
@@ -21,25 +263,24 @@ class NetEaseAPI:
                 }
             )
             result = response.json()
-            print("Login response:", result)
+            logger.debug("Login response code: %s", result.get("code"))
             
             if result.get("code") == 200:
                 result["status"] = self.get_user_status(result.get("cookie"))
             
             return result
         except Exception as e:
-            print(f"Login error: {e}")
+            logger.error("Login error: %s", e)
             return {"code": -1, "msg": f"登录失败: {str(e)}"}
 
     def get_qr_key(self):
         """获取二维码key"""
         try:
             timestamp = str(int(time.time() * 1000))
-            response = requests.get(
-                f"{self.base_url}/login/qr/key",
+            return self._get(
+                "/login/qr/key",
                 params={"timestamp": timestamp}
             )
-            return response.json()
         except Exception as e:
             return {"code": -1, "msg": str(e)}
 
@@ -47,15 +288,14 @@ class NetEaseAPI:
         """生成二维码"""
         try:
             timestamp = str(int(time.time() * 1000))
-            response = requests.get(
-                f"{self.base_url}/login/qr/create",
+            return self._get(
+                "/login/qr/create",
                 params={
                     "key": key,
                     "qrimg": True,
                     "timestamp": timestamp
                 }
             )
-            return response.json()
         except Exception as e:
             return {"code": -1, "msg": str(e)}
 
@@ -63,15 +303,14 @@ class NetEaseAPI:
         """检查二维码状态"""
         try:
             timestamp = str(int(time.time() * 1000))
-            response = requests.get(
-                f"{self.base_url}/login/qr/check", 
+            result = self._get(
+                "/login/qr/check",
                 params={
                     "key": key,
                     "timestamp": timestamp
                 }
             )
-            result = response.json()
-            print("QR status:", result)
+            logger.debug("QR status: %s %s", result.get("code"), result.get("message"))
             if result.get("code") == 803:
                 cookie = result.get("cookie")
                 status = self.post_login_status(cookie)
@@ -79,7 +318,7 @@ class NetEaseAPI:
                     result["profile"] = {"id": status["data"]["account"]["id"]}
             return result
         except Exception as e:
-            print(f"QR check error: {e}")
+            logger.error("QR check error: %s", e)
             return {"code": -1, "msg": str(e)}
 
     def post_login_status(self, cookie=None):
@@ -94,20 +333,20 @@ class NetEaseAPI:
                     cookie_str = cookie
                 headers = {'Cookie': cookie_str}
             
-            print("Checking login status with headers:", headers)
-            print("Using timestamp:", timestamp)
+            logger.debug("Checking login status (cookie: %s)", bool(cookie or self.headers))
             
-            response = requests.post(
-                f"{self.base_url}/login/status",
+            response = self._request(
+                "POST",
+                "/login/status",
                 params={"timestamp": timestamp},
                 data={"cookie": cookie} if cookie else {},
                 headers=headers
             )
             result = response.json()
-            print("Login status check result:", result)
+            logger.debug("Login status check code: %s", result.get("code"))
             return result
         except Exception as e:
-            print(f"Get login status error: {e}")
+            logger.error("Get login status error: %s", e)
             return {"code": -1, "msg": str(e)}
 
     def get_user_status(self, cookie=None):
@@ -117,14 +356,13 @@ class NetEaseAPI:
     def get_personalized_playlists(self, limit=30):
         """获取推荐歌单"""
         try:
-            response = requests.get(
-                f"{self.base_url}/personalized", 
+            return self._get(
+                "/personalized",
                 params={"limit": limit},
                 headers=self.headers
             )
-            return response.json()
         except Exception as e:
-            print(f"获取推荐歌单失败: {e}")
+            logger.error("获取推荐歌单失败: %s", e)
             return {"code": -1, "msg": str(e)}
 
     def set_cookie(self, cookie):
@@ -139,93 +377,287 @@ class NetEaseAPI:
                 csrf = cookie_str.split('__csrf=')[1].split(';')[0]
                 cookie_str += f'; MUSIC_U={csrf}'
         self.headers = {'Cookie': cookie_str}
-        print("Set cookie headers:", self.headers)
+        logger.debug("Cookie headers updated")
 
     def set_user_info(self, cookie, user_id):
         """设置用户信息"""
         self.set_cookie(cookie)
         self.user_id = user_id
 
-    def get_playlist_detail(self, playlist_id):
-        """获取歌单详情"""
+    def get_playlist_detail(self, playlist_id, fresh=False):
+        """获取歌单详情，fresh为True时跳过缓存直接请求服务器"""
         try:
-            response = requests.get(
-                f"{self.base_url}/playlist/detail",
-                params={"id": playlist_id},
-                headers=self.headers
+            params = {"id": playlist_id}
+            result = self._get(
+                "/playlist/detail",
+                params=params,
+                headers=self.headers,
+                use_cache=not fresh
             )
-            return response.json()
+            if fresh:
+                self._set_cached("/playlist/detail", params, result, self.headers)
+            return result
         except Exception as e:
-            print(f"获取歌单详情失败: {e}")
+            logger.error("获取歌单详情失败: %s", e)
             return {"code": -1, "msg": str(e)}
 
-    def get_playlist_tracks(self, playlist_id):
-        """获取歌单所有歌曲"""
+    def get_playlist_tracks(self, playlist_id, limit=None, offset=0):
+        """获取歌单歌曲，不传limit时获取全部
+
+        分页请求只缓存在磁盘：逐页处理就是为了不同时持有整个歌单，每一页都进内存LRU会把它们全部留在内存中。
+        """
+        params = {"id": playlist_id}
+        if limit is not None:
+            params.update(limit=limit, offset=offset)
         try:
-            response = requests.get(
-                f"{self.base_url}/playlist/track/all",
-                params={"id": playlist_id},
-                headers=self.headers
+            return self._get(
+                "/playlist/track/all",
+                params=params,
+                headers=self.headers,
+                use_memory=limit is None
             )
-            return response.json()
         except Exception as e:
-            print(f"获取歌单歌曲失败: {e}")
+            logger.error("获取歌单歌曲失败: %s", e)
             return {"code": -1, "msg": str(e)}
 
-    def get_user_playlists(self):
-        """获取用户歌单"""
+    def iter_playlist_tracks(self, playlist_id, page_size=TRACK_PAGE_SIZE, prefetch=True):
+        """按 limit/offset 分页获取歌单歌曲，逐页产出歌曲列表
+
+        prefetch 为 True 时，调用方处理当前页的同时在后台请求下一页，
+        同一时刻最多持有两页数据。请求失败时抛出 RuntimeError。
+        服务器会从页中去掉下架的歌曲，页不满不代表结束：按歌单详情的 trackCount 判断
+        是否还有下一页（详情请求与打开歌单时的详情请求合并），拿不到时以空页结束。
+        """
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="track-pager")
         try:
-            response = requests.get(
-                f"{self.base_url}/user/playlist",
+            offset = 0
+            future = executor.submit(self.get_playlist_tracks, playlist_id, page_size, offset)
+            detail = executor.submit(self.get_playlist_detail, playlist_id)
+            total = None
+            while future is not None:
+                result = future.result()
+                if result.get("code") != 200:
+                    raise RuntimeError(result.get("msg") or f"code {result.get('code')}")
+                songs = result.get("songs") or []
+                offset += page_size
+                if detail is not None:
+                    playlist = detail.result().get("playlist") or {}
+                    total = playlist.get("trackCount")
+                    detail = None
+                has_more = offset < total if total is not None else bool(songs)
+                future = None
+                if has_more and prefetch:
+                    future = executor.submit(self.get_playlist_tracks, playlist_id, page_size, offset)
+                if songs:
+                    yield songs
+                if has_more and future is None:
+                    future = executor.submit(self.get_playlist_tracks, playlist_id, page_size, offset)
+        finally:
+            executor.shutdown(wait=False)
+
+    def get_user_playlists(self, limit=USER_PLAYLIST_PAGE_SIZE, offset=0):
+        """获取用户歌单，返回中的 more 表示是否还有下一页"""
+        try:
+            return self._get(
+                "/user/playlist",
                 params={"uid": self.user_id,
-                        "limit": 40}, 
+                        "limit": limit,
+                        "offset": offset},
                 headers=self.headers
             )
-            return response.json()
         except Exception as e:
-            print(f"获取用户歌单失败: {e}")
+            logger.error("获取用户歌单失败: %s", e)
             return {"code": -1, "msg": str(e)}
 
+    def iter_user_playlists(self, page_size=USER_PLAYLIST_PAGE_SIZE):
+        """分页获取用户的全部歌单，逐页产出歌单列表，请求失败时抛出 RuntimeError"""
+        offset = 0
+        while True:
+            result = self.get_user_playlists(page_size, offset)
+            if result.get("code") != 200:
+                raise RuntimeError(result.get("msg") or f"code {result.get('code')}")
+            playlists = result.get("playlist") or []
+            offset += len(playlists)
+            if playlists:
+                yield playlists
+            if not playlists or not result.get("more"):
+                return
+
     def get_song_url(self, song_id):
-        """获取歌曲播放链接"""
+        """获取歌曲播放链接，并发的单曲请求会合并为一次批量请求"""
         try:
-            response = requests.get(
-                f"{self.base_url}/song/url",
-                params={
-                    "id": song_id,
-                    "level": "standard",
-                },
-                headers=self.headers
-            )
-            result = response.json()
-            print("Song URL response:", result)
+            entry = self._url_batcher.get(song_id)
+            result = {"code": 200, "data": [entry]} if entry else {"code": 404, "data": []}
+            logger.debug("Song URL response: %s", result)
             return result
         except Exception as e:
-            print(f"获取歌曲链接失败: {e}")
+            logger.error("获取歌曲链接失败: %s", e)
+            return {"code": -1, "msg": str(e)}
+
+    def get_song_urls(self, song_ids, level="standard"):
+        """批量获取歌曲播放链接，按服务器上限分块请求"""
+        try:
+            data = []
+            ids = [str(i) for i in song_ids]
+            for start in range(0, len(ids), SONG_URL_CHUNK):
+                result = self._get(
+                    "/song/url",
+                    params={
+                        "id": ",".join(ids[start:start + SONG_URL_CHUNK]),
+                        "level": level,
+                    },
+                    headers=self.headers
+                )
+                if result.get("code") != 200:
+                    return result
+                data.extend(result.get("data") or [])
+            return {"code": 200, "data": data}
+        except Exception as e:
+            logger.error("批量获取歌曲链接失败: %s", e)
             return {"code": -1, "msg": str(e)}
 
     def get_song_lyric(self, song_id):
         """获取歌词"""
         try:
-            response = requests.get(
-                f"{self.base_url}/lyric",
+            return self._get(
+                "/lyric",
                 params={"id": song_id},
                 headers=self.headers
             )
-            return response.json()
         except Exception as e:
-            print(f"获取歌词失败: {e}")
+            logger.error("获取歌词失败: %s", e)
             return {"code": -1, "msg": str(e)}
 
     def get_song_detail(self, song_id):
-        """获取歌曲详情"""
+        """获取歌曲详情，并发的单曲请求会合并为一次批量请求"""
         try:
-            response = requests.get(
-                f"{self.base_url}/song/detail",
-                params={"ids": song_id},
-                headers=self.headers
-            )
-            return response.json()
+            cached = self._get_cached("/song/detail", {"ids": song_id}, self.headers)
+            if cached is not None:
+                return cached
+            return self._detail_batcher.get(song_id) or {"code": 200, "songs": [], "privileges": []}
         except Exception as e:
-            print(f"获取歌曲详情失败: {e}")
+            logger.error("获取歌曲详情失败: %s", e)
             return {"code": -1, "msg": str(e)}
+
+    def get_song_details(self, song_ids):
+        """批量获取歌曲详情，按服务器上限分块请求，结果按传入顺序返回"""
+        try:
+            found = self._fetch_song_details(song_ids)
+            songs = []
+            privileges = []
+            for song_id in song_ids:
+                single = found.get(str(song_id))
+                if single:
+                    songs.extend(single["songs"])
+                    privileges.extend(single["privileges"])
+            return {"code": 200, "songs": songs, "privileges": privileges}
+        except Exception as e:
+            logger.error("批量获取歌曲详情失败: %s", e)
+            return {"code": -1, "msg": str(e)}
+
+    def _fetch_song_details(self, song_ids):
+        """返回 {id: 单曲详情响应}，每首歌单独缓存，已缓存的不再请求"""
+        ids = list(dict.fromkeys(str(i) for i in song_ids))
+        found = self._get_cached_songs(ids)
+        missing = [song_id for song_id in ids if song_id not in found]
+
+        for start in range(0, len(missing), SONG_DETAIL_CHUNK):
+            result = self._get(
+                "/song/detail",
+                params={"ids": ",".join(missing[start:start + SONG_DETAIL_CHUNK])},
+                headers=self.headers,
+                use_cache=False
+            )
+            if result.get("code") != 200:
+                raise RuntimeError(result.get("msg") or f"code {result.get('code')}")
+            privileges = {str(p["id"]): p for p in result.get("privileges") or []}
+            fetched = {}
+            for song in result.get("songs") or []:
+                song_id = str(song["id"])
+                fetched[song_id] = {
+                    "code": 200,
+                    "songs": [song],
+                    "privileges": [privileges[song_id]] if song_id in privileges else []
+                }
+            found.update(fetched)
+            self._set_cached_songs(fetched)
+        return found
+
+    def _fetch_song_urls(self, song_ids):
+        """供合并器调用，返回 {id: 播放链接条目}"""
+        result = self.get_song_urls(song_ids)
+        if result.get("code") != 200:
+            raise RuntimeError(result.get("msg") or f"code {result.get('code')}")
+        return {str(entry["id"]): entry for entry in result["data"]}
+
+class AsyncNetEaseAPI:
+    """NetEaseAPI 的 asyncio 版本，接口与 NetEaseAPI 保持一致
+
+    每个协程都在线程池中调用共享的 NetEaseAPI，复用其连接池和cookie，
+    调用方可以用 asyncio.gather 并发执行相互独立的请求。
+    """
+
+    def __init__(self, api=None, max_workers=None):
+        self.api = api or NetEaseAPI()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or self.api.pool_size,
+            thread_name_prefix="netease-api"
+        )
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args))
+
+    def set_cookie(self, cookie):
+        self.api.set_cookie(cookie)
+
+    def set_user_info(self, cookie, user_id):
+        self.api.set_user_info(cookie, user_id)
+
+    async def login(self, phone, password):
+        return await self._run(self.api.login, phone, password)
+
+    async def get_qr_key(self):
+        return await self._run(self.api.get_qr_key)
+
+    async def create_qr(self, key):
+        return await self._run(self.api.create_qr, key)
+
+    async def check_qr_status(self, key):
+        return await self._run(self.api.check_qr_status, key)
+
+    async def post_login_status(self, cookie=None):
+        return await self._run(self.api.post_login_status, cookie)
+
+    async def get_user_status(self, cookie=None):
+        return await self._run(self.api.get_user_status, cookie)
+
+    async def get_personalized_playlists(self, limit=30):
+        return await self._run(self.api.get_personalized_playlists, limit)
+
+    async def get_playlist_detail(self, playlist_id, fresh=False):
+        return await self._run(self.api.get_playlist_detail, playlist_id, fresh)
+
+    async def get_playlist_tracks(self, playlist_id, limit=None, offset=0):
+        return await self._run(self.api.get_playlist_tracks, playlist_id, limit, offset)
+
+    async def get_user_playlists(self, limit=USER_PLAYLIST_PAGE_SIZE, offset=0):
+        return await self._run(self.api.get_user_playlists, limit, offset)
+
+    async def get_song_url(self, song_id):
+        return await self._run(self.api.get_song_url, song_id)
+
+    async def get_song_lyric(self, song_id):
+        return await self._run(self.api.get_song_lyric, song_id)
+
+    async def get_song_detail(self, song_id):
+        return await self._run(self.api.get_song_detail, song_id)
+
+    async def get_song_details(self, song_ids):
+        return await self._run(self.api.get_song_details, song_ids)
+
+    async def get_song_urls(self, song_ids, level="standard"):
+        return await self._run(self.api.get_song_urls, song_ids, level)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
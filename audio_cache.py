@@ -0,0 +1,249 @@
+"""歌曲音频缓存：按 (歌曲id, 音质) 保存音频文件，总大小超过上限时删除最久未播放的文件"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from stream import StreamBuffer
+
+logger = logging.getLogger(__name__)
+
+# 与 NetEaseAPI.get_song_url 请求的音质一致
+DEFAULT_LEVEL = "standard"
+PART_SUFFIX = ".part"
+DONE_SUFFIX = ".done"
+
+
+def audio_key(song_id, level=DEFAULT_LEVEL):
+    """(歌曲id, 音质) 对应的缓存文件名"""
+    return f"{int(song_id)}_{level}"
+
+
+class AudioCache:
+    """磁盘音频缓存，重启后仍然有效
+
+    完整的文件以 audio_key 命名；下载中的文件带 .part 后缀，下载中断后保留，
+    下次播放同一首歌时用Range请求续传，下载完成后用 os.replace 原子地改为正式文件名。
+    Windows上播放器仍打开着 .part 时无法改名，这时写一个 .done 完成标记（内容为文件大小），
+    带标记的 .part 视为完整缓存，之后的 get 或重启时再改名。
+    完整文件和 .part 文件都计入容量，按修改时间（即最近播放时间）淘汰，正在下载的除外。
+    """
+
+    def __init__(self, path=os.path.join("cache", "audio"), max_bytes=1024 * 1024 * 1024):
+        if not os.path.exists(path):
+            os.makedirs(path)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files = OrderedDict()  # 文件名 -> 字节数，按最近使用排序
+        self._active = {}  # 正在下载的key -> StreamBuffer
+        self._complete = set()  # 已下载完整但还未改名的key（有 .done 标记）
+        self.bytes = 0
+        for name in os.listdir(path):
+            if name.endswith(DONE_SUFFIX):
+                self._recover(name[:-len(DONE_SUFFIX)])
+        entries = []
+        for name in os.listdir(path):
+            full = os.path.join(path, name)
+            if name.endswith(".tmp"):
+                os.remove(full)  # 写完成标记时中断留下的临时文件
+                continue
+            if name.endswith(DONE_SUFFIX):
+                continue
+            stat = os.stat(full)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self.bytes += size
+
+    def get(self, song_id, level=DEFAULT_LEVEL):
+        """返回已完整缓存的文件路径，没有时返回None"""
+        key = audio_key(song_id, level)
+        with self._lock:
+            if key in self._complete:
+                self._promote(key)
+            if key in self._files:
+                name = key
+            elif key in self._complete:
+                name = key + PART_SUFFIX
+            else:
+                return None
+            self._files.move_to_end(name)
+        full = os.path.join(self.path, name)
+        try:
+            os.utime(full)  # 更新修改时间，重启后仍能按最近使用淘汰
+        except OSError:
+            self._discard(name)
+            return None
+        return full
+
+    def contains(self, song_id, level=DEFAULT_LEVEL):
+        key = audio_key(song_id, level)
+        return key in self._files or key in self._complete
+
+    def open(self, song_id, url=None, level=DEFAULT_LEVEL, **kwargs):
+        """返回播放用的 StreamBuffer（未启动）：命中缓存时直接读文件，否则下载（或续传）到缓存
+
+        kwargs 传给 StreamBuffer（session、on_ready、on_progress 等）。
+        """
+        path = self.get(song_id, level)
+        if path is not None:
+            return StreamBuffer.from_file(path, **kwargs)
+        if url is None:
+            raise KeyError(f"音频未缓存: {song_id}")
+        key = audio_key(song_id, level)
+        with self._lock:
+            # 同一首歌上一次的下载线程可能还没退出（取消后要等到下一个分块才会发现），
+            # 新的下载先等它退出再续传，它已下载完整时直接使用它的文件
+            previous = self._active.get(key)
+            # 续传期间文件大小一直在变，下载结束后再重新计入
+            self.bytes -= self._files.pop(key + PART_SUFFIX, 0)
+            part = os.path.join(self.path, key + PART_SUFFIX)
+            stream = StreamBuffer(url, part, resume=True, previous=previous,
+                                  on_finish=lambda stream: self._finish(key, stream), **kwargs)
+            self._active[key] = stream
+        return stream
+
+    def _finish(self, key, stream):
+        """下载线程退出时调用：完整的文件改为正式文件名，中断的保留 .part 以便续传"""
+        part = os.path.join(self.path, key + PART_SUFFIX)
+        full = os.path.join(self.path, key)
+        name = key + PART_SUFFIX
+        complete = False
+        if stream.done and stream.downloaded > 0 and stream.path == full:
+            name = key  # 上一次的下载已经改好名，直接沿用
+        elif stream.done and stream.downloaded > 0:
+            # 与读取端打开文件用同一把锁，读取端不会拿到改名前的路径
+            with stream.cond:
+                try:
+                    os.replace(part, full)  # 原子替换，不会出现写了一半的正式文件
+                    stream.path = full
+                    name = key
+                except OSError:
+                    # Windows上播放器仍打开着文件时无法改名，写完成标记，之后再改名
+                    complete = True
+        try:
+            size = os.path.getsize(os.path.join(self.path, name))
+        except OSError:
+            size = None
+        if complete and size is not None:
+            complete = self._write_marker(key, size)
+        with self._lock:
+            if self._active.get(key) is stream:
+                del self._active[key]
+            if size is not None:
+                self.bytes += size - self._files.pop(name, 0)
+                self._files[name] = size
+            stale = []
+            if complete:
+                self._complete.add(key)
+            elif name == key:
+                # 上一次的下载可能留下了 .part 条目和完成标记
+                self.bytes -= self._files.pop(key + PART_SUFFIX, 0)
+                if key in self._complete:
+                    self._complete.discard(key)
+                    stale.append(key + DONE_SUFFIX)
+            evicted = stale + self._evict()
+        for name in evicted:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+    def _write_marker(self, key, size):
+        """原子地写入完成标记，失败时返回False（这时 .part 只能靠续传补完）"""
+        marker = os.path.join(self.path, key + DONE_SUFFIX)
+        tmp = marker + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                f.write(str(size))
+            os.replace(tmp, marker)
+            return True
+        except OSError as e:
+            logger.warning("保存音频缓存失败 %s: %s", key, e)
+            return False
+
+    def _recover(self, key):
+        """启动时处理完成标记：大小对得上就改名，改不了名时保留标记，否则删除标记"""
+        marker = os.path.join(self.path, key + DONE_SUFFIX)
+        part = os.path.join(self.path, key + PART_SUFFIX)
+        try:
+            with open(marker) as f:
+                size = int(f.read())
+            valid = os.path.getsize(part) == size
+        except (OSError, ValueError):
+            valid = False
+        if valid:
+            try:
+                os.replace(part, os.path.join(self.path, key))
+            except OSError:
+                self._complete.add(key)
+                return
+        try:
+            os.remove(marker)
+        except OSError:
+            pass
+
+    def _promote(self, key):
+        """在锁内把带完成标记的 .part 改为正式文件名，文件仍被打开时保持原样"""
+        part = key + PART_SUFFIX
+        try:
+            os.replace(os.path.join(self.path, part), os.path.join(self.path, key))
+        except OSError:
+            return
+        self._complete.discard(key)
+        if part in self._files:
+            self._files[key] = self._files.pop(part)
+        try:
+            os.remove(os.path.join(self.path, key + DONE_SUFFIX))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """在锁内选出需要删除的文件，跳过正在下载的文件，至少保留一个文件"""
+        evicted = []
+        for name in list(self._files):
+            if self.bytes <= self.max_bytes or len(self._files) <= 1:
+                break
+            key = name[:-len(PART_SUFFIX)] if name.endswith(PART_SUFFIX) else name
+            if key in self._active:
+                continue
+            self.bytes -= self._files.pop(name)
+            evicted.append(name)
+            if key in self._complete:
+                self._complete.discard(key)
+                evicted.append(key + DONE_SUFFIX)
+        return evicted
+
+    def _discard(self, name):
+        with self._lock:
+            self.bytes -= self._files.pop(name, 0)
+            key = name[:-len(PART_SUFFIX)] if name.endswith(PART_SUFFIX) else name
+            if key not in self._complete:
+                return
+            self._complete.discard(key)
+        try:
+            os.remove(os.path.join(self.path, key + DONE_SUFFIX))
+        except OSError:
+            pass
+
+    def clear(self):
+        with self._lock:
+            names = [name for name in self._files if name.split(".")[0] not in self._active]
+            for name in names:
+                self.bytes -= self._files.pop(name)
+            names += [key + DONE_SUFFIX for key in self._complete if key not in self._active]
+            self._complete.intersection_update(self._active)
+        for name in names:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._files)
+
+
+def create_default_audio_cache():
+    """默认音频缓存：cache/audio 目录，最多1GB"""
+    return AudioCache()
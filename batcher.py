@@ -0,0 +1,65 @@
+"""把并发的单个id请求合并成批量请求"""
+import threading
+import time
+
+
+class _Batch:
+    def __init__(self):
+        self.ids = []
+        self.done = threading.Event()
+        self.results = {}
+        self.error = None
+
+
+class RequestBatcher:
+    """在一个很短的时间窗口内收集单个id请求，合并成一次批量调用
+
+    fetch_many(ids) 接收id列表，返回 {str(id): result} 字典。
+    第一个到达的调用方负责在窗口结束后发出请求，其余调用方等待结果。
+    """
+
+    def __init__(self, fetch_many, window=0.01, max_batch=500):
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending = None
+        self.requests = 0  # 收到的单个请求数
+        self.batches = 0   # 实际发出的批量请求数
+
+    def get(self, item_id):
+        key = str(item_id)
+        with self._lock:
+            self.requests += 1
+            batch = self._pending
+            leader = batch is None
+            if leader:
+                batch = self._pending = _Batch()
+            if key not in batch.ids:
+                batch.ids.append(key)
+            if len(batch.ids) >= self.max_batch:
+                # 批次已满，后来的请求进入新批次
+                self._pending = None
+
+        if leader:
+            self._flush(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results.get(key)
+
+    def _flush(self, batch):
+        if self.window:
+            time.sleep(self.window)
+        with self._lock:
+            if self._pending is batch:
+                self._pending = None
+            self.batches += 1
+        try:
+            batch.results = self.fetch_many(list(batch.ids))
+        except Exception as e:
+            batch.error = e
+        finally:
+            batch.done.set()
@@ -0,0 +1,65 @@
+"""NetEaseAPI 请求吞吐量与并发重叠"""
+import asyncio
+import time
+
+import requests
+
+from api import NetEaseAPI, AsyncNetEaseAPI
+from mock_server import MockServer
+
+
+def plain_rate(base_url, count):
+    """每次请求都新建TCP连接"""
+    start = time.perf_counter()
+    for i in range(count):
+        requests.get(f"{base_url}/lyric", params={"id": i + 1}).json()
+    return count / (time.perf_counter() - start)
+
+
+def pooled_rate(api, count):
+    """复用NetEaseAPI的连接池会话"""
+    start = time.perf_counter()
+    for i in range(count):
+        api.get_song_lyric(i + 1)
+    return count / (time.perf_counter() - start)
+
+
+async def gather_song(async_api, song_id):
+    await asyncio.gather(
+        async_api.get_song_detail(song_id),
+        async_api.get_song_url(song_id),
+        async_api.get_song_lyric(song_id)
+    )
+
+
+def run(quick=False):
+    count = 200 if quick else 1000
+    results = {}
+    with MockServer() as server:
+        # 关闭缓存和限速，只测量网络路径
+        api = NetEaseAPI(base_url=server.base_url, cache=False,
+                         rate_limits={"default": (1e6, 1e6), "media": (1e6, 1e6)})
+        results["plain_requests_per_s"] = round(plain_rate(server.base_url, count), 1)
+        results["pooled_requests_per_s"] = round(pooled_rate(api, count), 1)
+        api.close()
+
+    with MockServer(latency=0.05) as server:
+        api = NetEaseAPI(base_url=server.base_url, cache=False, coalesce_window=0)
+        async_api = AsyncNetEaseAPI(api)
+        # 预热：建立连接并让模拟服务器生成音频
+        api.get_song_url(0)
+        start = time.perf_counter()
+        api.get_song_detail(1)
+        api.get_song_url(1)
+        api.get_song_lyric(1)
+        results["song_sequential_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        start = time.perf_counter()
+        asyncio.run(gather_song(async_api, 2))
+        results["song_concurrent_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        async_api.close()
+        api.close()
+    return results
+
+
+if __name__ == "__main__":
+    print(run())
@@ -0,0 +1,57 @@
+"""封面下载、解码和缩放：原图全尺寸解码与缩略图URL + draft解码对比"""
+from io import BytesIO
+
+import requests
+from PIL import Image
+
+from benchmarks.common import measure
+from image_loader import ImageLoader, decode_thumbnail, thumbnail_url
+from mock_server import MockServer
+
+
+def run(quick=False):
+    results = {}
+    with MockServer(cover_size=1000) as server:
+        session = requests.Session()
+        url = f"{server.base_url}/media/cover/1.jpg"
+        data = session.get(url).content
+        results["cover_bytes"] = len(data)
+
+        def fetch():
+            return session.get(url).content
+
+        def decode_resize():
+            Image.open(BytesIO(data)).resize((120, 120))
+
+        def full_pipeline():
+            Image.open(BytesIO(fetch())).resize((120, 120))
+
+        thumb_url = thumbnail_url(url, (120, 120))
+        results["thumbnail_bytes"] = len(session.get(thumb_url).content)
+
+        def fetch_thumbnail():
+            return session.get(thumb_url).content
+
+        def draft_decode():
+            decode_thumbnail(data, (120, 120))
+
+        loader = ImageLoader(max_workers=1, cache=False)
+
+        def loader_pipeline():
+            loader.fetch(url, (120, 120))
+
+        repeat = 5 if quick else 20
+        results["fetch"] = measure(fetch, repeat=repeat)
+        results["decode_resize_120"] = measure(decode_resize, repeat=repeat)
+        results["fetch_decode_resize_120"] = measure(full_pipeline, repeat=repeat)
+        results["fetch_thumbnail_120"] = measure(fetch_thumbnail, repeat=repeat)
+        results["draft_decode_120"] = measure(draft_decode, repeat=repeat)
+        results["loader_fetch_120"] = measure(loader_pipeline, repeat=repeat)
+        loader.executor.shutdown()
+        loader.session.close()
+        session.close()
+    return results
+
+
+if __name__ == "__main__":
+    print(run())
@@ -0,0 +1,27 @@
+"""LRC歌词解析"""
+from benchmarks.common import measure
+from lyrics import parse_lyrics
+
+
+def long_lrc(lines):
+    """生成带多时间戳、元信息和空行的长歌词"""
+    out = ["[ti:标题]", "[ar:歌手]", "[by:benchmark]", ""]
+    for i in range(lines):
+        second = i * 3
+        stamp = f"[{second // 60 % 100:02d}:{second % 60:02d}.{i % 100:02d}]"
+        if i % 10 == 0:
+            stamp += f"[{(second + 600) // 60 % 100:02d}:{second % 60:02d}.00]"
+        out.append(f"{stamp}这是第{i}句歌词 lyric line {i}")
+    return "\n".join(out)
+
+
+def run(quick=False):
+    results = {}
+    for lines in (100, 2000, 20000):
+        text = long_lrc(lines)
+        results[f"parse_{lines}_lines"] = measure(lambda: parse_lyrics(text), repeat=3 if quick else 7)
+    return results
+
+
+if __name__ == "__main__":
+    print(run())
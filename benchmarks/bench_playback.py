@@ -0,0 +1,62 @@
+"""PlayerWindow.play_audio 的首次出声时间，分别测量未缓存和已缓存
+
+需要显示环境和VLC，缺少时跳过。
+"""
+import tempfile
+import time
+
+from benchmarks.common import create_tk_root, Skip
+from mock_server import MockServer
+
+
+def run(quick=False):
+    try:
+        import vlc
+        vlc.Instance()
+    except Exception as e:
+        raise Skip(f"libvlc unavailable: {e}")
+    root = create_tk_root()
+    from api import NetEaseAPI
+    from audio_cache import AudioCache
+    from player_window import PlayerWindow
+
+    results = {}
+    try:
+        with MockServer(audio_seconds=60, bandwidth=2_000_000) as server:
+            api = NetEaseAPI(base_url=server.base_url, cache=False)
+            player = PlayerWindow.get_instance(api)
+            player.hide_window()
+            url = api.get_song_url(1)["data"][0]["url"]
+
+            def first_audio_ms():
+                start = time.perf_counter()
+                player.play_audio(1, url)
+                # 播放引擎第一次报告播放位置即视为出声
+                while player.current_time <= 0 and time.perf_counter() - start < 30:
+                    root.update()
+                    time.sleep(0.001)
+                elapsed = (time.perf_counter() - start) * 1000
+                stream = player.stream
+                player.stop_current_playback()
+                stream.join()
+                return elapsed
+
+            cold, warm = [], []
+            with tempfile.TemporaryDirectory() as cache_dir:
+                for i in range(1 if quick else 3):
+                    # 每轮用空的音频缓存测量首次播放，再测量命中缓存的重播
+                    player.audio_cache = AudioCache(f"{cache_dir}/{i}")
+                    cold.append(first_audio_ms())
+                    # 把停止时中断的下载续传完整
+                    player.audio_cache.open(1, url, session=api.session).start().join()
+                    warm.append(first_audio_ms())
+            results["time_to_first_audio_ms"] = round(min(cold), 1)
+            results["time_to_first_audio_cached_ms"] = round(min(warm), 1)
+            player.on_closing()
+    finally:
+        root.destroy()
+    return results
+
+
+if __name__ == "__main__":
+    print(run())
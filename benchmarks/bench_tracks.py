@@ -0,0 +1,78 @@
+"""PlaylistDetailWindow 歌曲列表：行格式化、搜索索引和完整的分页加载与Treeview插入"""
+import time
+
+from benchmarks.common import measure, fake_songs, create_tk_root, Skip
+from mock_server import MockServer
+from playlist_detail import format_row
+from search_index import TrackIndex
+from track import Track
+
+SIZES = (100, 1000, 10000)
+
+
+def format_rows(songs):
+    return [format_row(Track.from_song(song), i) for i, song in enumerate(songs, 1)]
+
+
+def build_index(rows):
+    index = TrackIndex()
+    for i, values in enumerate(rows, 1):
+        index.add(str(i), values[1], values[2], values[3])
+    return index
+
+
+def type_query(index, query):
+    """模拟逐字输入，每个前缀查询一次"""
+    for end in range(1, len(query) + 1):
+        index.search(query[:end])
+
+
+def load_window(api, root, expected):
+    """打开歌单详情窗口，驱动Tk主循环直到 load_tracks 分页插入完毕"""
+    from playlist_detail import PlaylistDetailWindow
+    window = PlaylistDetailWindow(api, 1)
+    deadline = time.perf_counter() + 120
+    try:
+        while window.tracks_loading and time.perf_counter() < deadline:
+            root.update()
+        if window.track_count != expected:
+            raise RuntimeError(f"只加载了 {window.track_count}/{expected} 首歌曲")
+    finally:
+        window.on_closing()
+
+
+def run(quick=False):
+    results = {}
+    repeat = 3 if quick else 5
+    for size in SIZES:
+        songs = fake_songs(size)
+        results[f"format_{size}"] = measure(lambda: format_rows(songs), repeat=repeat)
+
+    rows = format_rows(fake_songs(SIZES[-1]))
+    results[f"search_build_{SIZES[-1]}"] = measure(lambda: build_index(rows), repeat=1 if quick else 3)
+    index = build_index(rows)
+    for query in ("歌曲123", "gq12", "歌手5 专辑"):
+        # 结果为整个查询串的耗时，除以字数即为每次按键的耗时
+        results[f"search_typing_{query}"] = measure(lambda: type_query(index, query), repeat=repeat)
+
+    try:
+        root = create_tk_root()
+    except Skip as e:
+        results["load_tracks"] = f"skipped: {e}"
+        return results
+
+    from api import NetEaseAPI
+    try:
+        for size in SIZES:
+            with MockServer(track_count=size) as server:
+                api = NetEaseAPI(base_url=server.base_url, cache=False)
+                results[f"load_tracks_{size}"] = measure(
+                    lambda: load_window(api, root, size), repeat=1 if quick else 3)
+                api.close()
+    finally:
+        root.destroy()
+    return results
+
+
+if __name__ == "__main__":
+    print(run())
@@ -0,0 +1,45 @@
+"""基准测试公共工具"""
+import statistics
+import time
+
+
+class Skip(Exception):
+    """当前环境缺少依赖（如显示器、libvlc）时跳过该项"""
+
+
+def measure(fn, repeat=5, number=1, warmup=1):
+    """重复执行fn，返回每次调用耗时（毫秒）的统计
+
+    取中位数作为主要指标，比平均值更不容易受偶发抖动影响。
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "stdev_ms": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "repeat": repeat,
+        "number": number
+    }
+
+
+def fake_songs(count):
+    from mock_server import fake_song
+    return [fake_song(i) for i in range(1, count + 1)]
+
+
+def create_tk_root():
+    """创建隐藏的Tk根窗口，没有显示环境时抛出Skip"""
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise Skip(f"no display: {e}")
+    root.withdraw()
+    return root
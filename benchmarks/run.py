@@ -0,0 +1,95 @@
+"""运行全部基准测试并输出JSON结果
+
+用法:
+    python -m benchmarks.run                          # 输出到 benchmarks/results.json
+    python -m benchmarks.run --quick --only api,lyrics
+    python -m benchmarks.run --compare old.json       # 与上次结果对比
+"""
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import time
+import traceback
+
+from benchmarks.common import Skip
+
+BENCHMARKS = ("api", "tracks", "lyrics", "images", "playback")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def flatten(data, prefix=""):
+    """把嵌套结果展开为 {"a.b.median_ms": 1.0} 形式，便于对比"""
+    items = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            items.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[name] = value
+    return items
+
+
+def compare(old, new):
+    """打印两次结果中数值指标的变化"""
+    old_items = flatten(old.get("results", {}))
+    new_items = flatten(new.get("results", {}))
+    for name in sorted(new_items):
+        if name.endswith((".repeat", ".number")) or name not in old_items:
+            continue
+        before, after = old_items[name], new_items[name]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:55s} {before:12.3f} -> {after:12.3f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线基准测试")
+    parser.add_argument("--quick", action="store_true", help="减少重复次数")
+    parser.add_argument("--only", help="逗号分隔的测试名: " + ",".join(BENCHMARKS))
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--compare", help="与之前的结果文件对比")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else BENCHMARKS
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "quick": args.quick
+        },
+        "results": {}
+    }
+    for name in names:
+        module = importlib.import_module(f"benchmarks.bench_{name}")
+        print(f"running {name}...", file=sys.stderr)
+        try:
+            report["results"][name] = module.run(quick=args.quick)
+        except Skip as e:
+            report["results"][name] = {"skipped": str(e)}
+        except Exception as e:
+            traceback.print_exc()
+            report["results"][name] = {"error": repr(e)}
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
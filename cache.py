@@ -0,0 +1,292 @@
+"""接口响应缓存：内存LRU + SQLite磁盘两级缓存"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """带过期时间的内存LRU缓存"""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """持久化到SQLite的缓存，超过容量时淘汰最久未访问的条目
+
+    读取只执行SELECT，访问时间先记在内存里，攒够一批或下次写入时在同一个事务中更新；
+    条目数在内存中维护，超出容量一定比例后才集中淘汰一次。
+    """
+
+    # 攒够这么多条访问记录就写回一次
+    TOUCH_BATCH = 256
+    # IN 查询每次最多带的参数个数，低于SQLite的默认上限999
+    QUERY_CHUNK = 500
+
+    def __init__(self, path=os.path.join("cache", "api_cache.db"), max_entries=20000):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.max_entries = max_entries
+        # 超出容量这么多条后才淘汰，避免每次写入都删除
+        self.evict_slack = max(1, max_entries // 10)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        self._touched = {}  # key -> 尚未写回的访问时间
+        self._expired = set()  # 读到的已过期条目，下次写入时删除
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def get_entry(self, key):
+        """返回 (value, expires_at)，不存在或已过期时返回None"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """批量读取，返回 {key: (value, expires_at)}，只包含存在且未过期的条目"""
+        now = time.time()
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), self.QUERY_CHUNK):
+                chunk = keys[start:start + self.QUERY_CHUNK]
+                rows = self._conn.execute(
+                    "SELECT key, value, expires_at FROM responses WHERE key IN "
+                    f"({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, value, expires_at in rows:
+                    if expires_at < now:
+                        self._expired.add(key)
+                    else:
+                        found[key] = (value, expires_at)
+                        self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH or len(self._expired) >= self.TOUCH_BATCH:
+                self._flush()
+                self._conn.commit()
+        return {key: (json.loads(value), expires_at) for key, (value, expires_at) in found.items()}
+
+    def set(self, key, value, ttl):
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items, ttl):
+        """在一个事务中写入 {key: value}，有效期相同"""
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, json.dumps(value, ensure_ascii=False), now + ttl, now)
+                for key, value in items.items()]
+        keys = list(items)
+        with self._lock:
+            self._flush()
+            existing = 0
+            for start in range(0, len(keys), self.QUERY_CHUNK):
+                chunk = keys[start:start + self.QUERY_CHUNK]
+                existing += self._conn.execute(
+                    "SELECT COUNT(*) FROM responses WHERE key IN "
+                    f"({','.join('?' * len(chunk))})", chunk
+                ).fetchone()[0]
+            self._conn.executemany("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", rows)
+            self._count += len(rows) - existing
+            for key in keys:
+                self._touched.pop(key, None)
+                self._expired.discard(key)
+            if self._count > self.max_entries + self.evict_slack:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (self._count - self.max_entries,)
+                )
+                self._count = self.max_entries
+            self._conn.commit()
+
+    def _flush(self):
+        """在锁内写回攒下的访问时间并删除已过期条目，由调用方提交事务"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+        if self._expired:
+            cursor = self._conn.executemany(
+                "DELETE FROM responses WHERE key = ?", [(key,) for key in self._expired]
+            )
+            self._count -= cursor.rowcount
+            self._expired.clear()
+
+    def delete(self, key):
+        with self._lock:
+            self._touched.pop(key, None)
+            self._expired.discard(key)
+            cursor = self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count -= cursor.rowcount
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._expired.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.commit()
+            self._conn.close()
+
+
+class ResponseCache:
+    """两级响应缓存，先查内存再查磁盘，磁盘命中会回填内存
+
+    缓存的值会被多个调用方共享，取出后不要原地修改。
+    """
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else LRUCache()
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.disk is not None:
+            try:
+                entry = self.disk.get_entry(key)
+            except sqlite3.Error as e:
+                logger.warning("读取磁盘缓存失败: %s", e)
+                entry = None
+            if entry is not None:
+                value, expires_at = entry
+                self.hits += 1
+                self.disk_hits += 1
+                # 回填内存，沿用磁盘上剩余的有效期
+                self.memory.set(key, value, expires_at - time.time())
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl):
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, ttl)
+            except sqlite3.Error as e:
+                logger.warning("写入磁盘缓存失败: %s", e)
+
+    def get_many(self, keys, use_memory=True):
+        """批量读取，返回 {key: value}；磁盘只查询一次
+
+        use_memory=False 时不查也不回填内存LRU，用于数量很多的小条目，
+        避免把歌单、歌词等常用条目挤出内存。
+        """
+        found = {}
+        if use_memory:
+            for key in keys:
+                value = self.memory.get(key)
+                if value is not None:
+                    found[key] = value
+        missing = [key for key in keys if key not in found]
+        if missing and self.disk is not None:
+            try:
+                entries = self.disk.get_many(missing)
+            except sqlite3.Error as e:
+                logger.warning("读取磁盘缓存失败: %s", e)
+                entries = {}
+            now = time.time()
+            for key, (value, expires_at) in entries.items():
+                found[key] = value
+                if use_memory:
+                    self.memory.set(key, value, expires_at - now)
+            self.disk_hits += len(entries)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items, ttl, use_memory=True):
+        """批量写入 {key: value}，磁盘写入在一个事务中完成"""
+        if use_memory:
+            for key, value in items.items():
+                self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            try:
+                self.disk.set_many(items, ttl)
+            except sqlite3.Error as e:
+                logger.warning("写入磁盘缓存失败: %s", e)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """返回命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_entries": len(self.memory)
+        }
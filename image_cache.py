@@ -0,0 +1,208 @@
+"""封面图片缓存：按 (URL, 尺寸) 缓存缩放后的图片，内存LRU + 磁盘两级"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+def image_key(url, size):
+    """(URL, 尺寸) 对应的缓存文件名"""
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return f"{digest}_{size[0]}x{size[1]}.jpg"
+
+
+class MemoryImageCache:
+    """按解码后占用的字节数限制容量的LRU"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data = OrderedDict()  # key -> PIL图片
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def image_bytes(image):
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, key):
+        with self._lock:
+            image = self._data.get(key)
+            if image is not None:
+                self._data.move_to_end(key)
+            return image
+
+    def set(self, key, image):
+        nbytes = self.image_bytes(image)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= self.image_bytes(old)
+            self._data[key] = image
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.bytes -= self.image_bytes(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskImageCache:
+    """把缩放后的图片存成JPEG文件，总大小超过上限时删除最久未使用的文件"""
+
+    def __init__(self, path=os.path.join("cache", "images"), max_bytes=200 * 1024 * 1024):
+        if not os.path.exists(path):
+            os.makedirs(path)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files = OrderedDict()  # 文件名 -> 字节数，按最近使用排序
+        self.bytes = 0
+        entries = []
+        for name in os.listdir(path):
+            full = os.path.join(path, name)
+            if name.endswith(".tmp"):
+                os.remove(full)  # 上次写入中断留下的临时文件
+                continue
+            stat = os.stat(full)
+            entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self.bytes += size
+
+    def get(self, key):
+        full = os.path.join(self.path, key)
+        with self._lock:
+            if key not in self._files:
+                return None
+            self._files.move_to_end(key)
+        try:
+            os.utime(full)  # 更新修改时间，重启后仍能按最近使用淘汰
+            image = Image.open(full)
+            image.load()
+            return image
+        except OSError as e:
+            logger.warning("读取图片缓存失败 %s: %s", key, e)
+            self._discard(key)
+            return None
+
+    def set(self, key, image):
+        full = os.path.join(self.path, key)
+        tmp = f"{full}.{threading.get_ident()}.tmp"
+        try:
+            image.save(tmp, "JPEG", quality=90)
+            os.replace(tmp, full)  # 原子替换，避免读到写了一半的文件
+            size = os.path.getsize(full)
+        except OSError as e:
+            logger.warning("写入图片缓存失败 %s: %s", key, e)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        evicted = []
+        with self._lock:
+            self.bytes += size - self._files.pop(key, 0)
+            self._files[key] = size
+            while self.bytes > self.max_bytes and len(self._files) > 1:
+                name, nbytes = self._files.popitem(last=False)
+                self.bytes -= nbytes
+                evicted.append(name)
+        for name in evicted:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+    def _discard(self, key):
+        with self._lock:
+            self.bytes -= self._files.pop(key, 0)
+        try:
+            os.remove(os.path.join(self.path, key))
+        except OSError:
+            pass
+
+    def clear(self):
+        with self._lock:
+            names = list(self._files)
+            self._files.clear()
+            self.bytes = 0
+        for name in names:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._files)
+
+
+class ImageCache:
+    """两级图片缓存，先查内存再查磁盘，磁盘命中会回填内存"""
+
+    def __init__(self, memory=None, disk=None):
+        self.memory = memory if memory is not None else MemoryImageCache()
+        self.disk = disk
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def peek(self, url, size):
+        """只查内存，供Tk线程同步使用"""
+        return self.memory.get(image_key(url, size))
+
+    def get(self, url, size):
+        key = image_key(url, size)
+        image = self.memory.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+        if self.disk is not None:
+            image = self.disk.get(key)
+            if image is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self.memory.set(key, image)
+                return image
+        self.misses += 1
+        return None
+
+    def set(self, url, size, image):
+        key = image_key(url, size)
+        self.memory.set(key, image)
+        if self.disk is not None:
+            self.disk.set(key, image)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """返回命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.bytes,
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+            "disk_bytes": self.disk.bytes if self.disk is not None else 0
+        }
+
+
+def create_default_image_cache():
+    """默认图片缓存：内存LRU + cache/images 目录"""
+    return ImageCache(MemoryImageCache(), DiskImageCache())
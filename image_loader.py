@@ -0,0 +1,214 @@
+"""后台图片加载：在线程池中下载、解码和缩放封面，完成后通过 after() 交回Tk线程"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from PIL import Image, ImageTk
+from requests.adapters import HTTPAdapter
+
+from image_cache import create_default_image_cache
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+def thumbnail_url(url, size):
+    """在图片URL上加 param=宽y高，让网易云CDN直接返回缩略图"""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "param"]
+    query.append(("param", f"{size[0]}y{size[1]}"))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def decode_thumbnail(data, size):
+    """解码并缩放图片
+
+    JPEG先用draft()按1/2、1/4、1/8比例降分辨率解码，再用reduce()快速缩小，
+    服务器没有按要求返回缩略图时也不需要以原始分辨率解码整张图。
+    """
+    image = Image.open(BytesIO(data))
+    image.draft("RGB", size)
+    image = image.convert("RGB")
+    if image.size != size:
+        image = image.resize(size, Image.BICUBIC, reducing_gap=2.0)
+    return image
+
+
+class Ticket:
+    """一次加载请求，可取消"""
+
+    def __init__(self, url, size, owner):
+        self.url = url
+        self.size = size
+        self.owner = owner
+        self.cancelled = False
+        self.future = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class ImageLoader:
+    """所有窗口共享的图片加载服务（单例）"""
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """获取图片加载器实例（单例模式）"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_workers=6, timeout=(3.05, 10), cache=None, metrics=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-loader")
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.timeout = timeout
+        self.metrics = metrics or REGISTRY  # 封面下载计入 "cdn" 接口的统计
+        # cache为None时使用默认两级缓存，传False关闭缓存
+        if cache is None:
+            cache = create_default_image_cache()
+        self.cache = cache or None
+        self._lock = threading.Lock()
+        self._tickets = {}         # owner -> set(Ticket)
+        self._widget_tickets = {}  # 控件 -> 该控件上正在进行的Ticket
+        self._placeholders = {}
+
+    def placeholder(self, size, color="#d9d9d9"):
+        """灰色占位图，必须在Tk线程调用"""
+        key = (size, color)
+        if key not in self._placeholders:
+            self._placeholders[key] = ImageTk.PhotoImage(Image.new("RGB", size, color))
+        return self._placeholders[key]
+
+    def fetch(self, url, size):
+        """获取缩放后的图片，先查缓存，未命中时下载解码，在工作线程中执行"""
+        if self.cache is not None:
+            image = self.cache.get(url, size)
+            if image is not None:
+                return image
+        image = decode_thumbnail(self.download(thumbnail_url(url, size)), size)
+        if self.cache is not None:
+            self.cache.set(url, size, image)
+        return image
+
+    def download(self, url):
+        """下载图片内容，记录延迟、状态码和字节数"""
+        start = time.monotonic()
+        status = None
+        nbytes = 0
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            status = response.status_code
+            nbytes = len(response.content)
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            if status is None:
+                status = type(e).__name__
+            raise
+        finally:
+            self.metrics.record_request("cdn", time.monotonic() - start, status, nbytes)
+
+    def load(self, widget, url, size, callback, owner=None):
+        """异步加载图片，完成后在Tk线程调用 callback(photo)
+
+        widget 用于调度 after()；owner 用于 cancel(owner) 批量取消，默认为widget。
+        """
+        if self.cache is not None:
+            # 内存命中时直接显示，不经过线程池，也不会闪一下占位图
+            image = self.cache.peek(url, size)
+            if image is not None:
+                callback(ImageTk.PhotoImage(image))
+                return None
+        owner = owner if owner is not None else widget
+        ticket = Ticket(url, size, owner)
+        with self._lock:
+            self._tickets.setdefault(owner, set()).add(ticket)
+        ticket.future = self.executor.submit(self._run, ticket, widget, callback)
+        return ticket
+
+    def load_into(self, label, url, size, owner=None, placeholder=True):
+        """把图片加载到Label上，同一个Label上未完成的旧请求会被取消"""
+        with self._lock:
+            previous = self._widget_tickets.pop(str(label), None)
+        if previous is not None:
+            previous.cancel()
+        if not url:
+            if placeholder:
+                self._set_image(label, self.placeholder(size))
+            return None
+
+        def apply(photo):
+            self._set_image(label, photo)
+
+        ticket = self.load(label, url, size, apply, owner)
+        if ticket is not None:
+            if placeholder:
+                self._set_image(label, self.placeholder(size))
+            with self._lock:
+                self._widget_tickets[str(label)] = ticket
+        return ticket
+
+    def _set_image(self, label, photo):
+        if label.winfo_exists():
+            label.config(image=photo)
+            label.image = photo  # 保持引用，避免被回收
+
+    def _run(self, ticket, widget, callback):
+        if ticket.cancelled:
+            self._forget(ticket)
+            return
+        try:
+            image = self.fetch(ticket.url, ticket.size)
+        except Exception as e:
+            logger.warning("加载图片失败 %s: %s", ticket.url, e)
+            self._forget(ticket)
+            return
+        if ticket.cancelled:
+            self._forget(ticket)
+            return
+        try:
+            widget.after(0, lambda: self._deliver(ticket, widget, image, callback))
+        except RuntimeError:
+            # Tk主循环已退出
+            self._forget(ticket)
+
+    def _deliver(self, ticket, widget, image, callback):
+        """在Tk线程中创建PhotoImage并回调"""
+        self._forget(ticket)
+        if ticket.cancelled or not widget.winfo_exists():
+            return
+        try:
+            callback(ImageTk.PhotoImage(image))
+        except Exception as e:
+            logger.warning("显示图片失败: %s", e)
+
+    def _forget(self, ticket):
+        with self._lock:
+            tickets = self._tickets.get(ticket.owner)
+            if tickets is not None:
+                tickets.discard(ticket)
+                if not tickets:
+                    del self._tickets[ticket.owner]
+            for key, current in list(self._widget_tickets.items()):
+                if current is ticket:
+                    del self._widget_tickets[key]
+
+    def stats(self):
+        return self.cache.stats() if self.cache is not None else {}
+
+    def cancel(self, owner):
+        """取消owner的所有未完成请求，窗口关闭时调用"""
+        with self._lock:
+            tickets = self._tickets.pop(owner, set())
+        for ticket in tickets:
+            ticket.cancel()
@@ -8,6 +8,8 @@ import threading
 import time
 from io import BytesIO
 import qrcode
+import logging
+from metrics import REGISTRY
 
 class LoginWindow:
     def __init__(self):
@@ -204,5 +206,12 @@ class LoginWindow:
             self.setup_ui()
 
 if __name__ == "__main__":
+    # 日志级别和统计端口可通过环境变量配置，例如 NETEASE_LOG_LEVEL=DEBUG
+    logging.basicConfig(
+        level=os.environ.get("NETEASE_LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    if os.environ.get("NETEASE_METRICS_PORT"):
+        REGISTRY.serve(int(os.environ["NETEASE_METRICS_PORT"]))
     app = LoginWindow()
     app.root.mainloop()
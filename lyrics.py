@@ -0,0 +1,20 @@
+"""LRC歌词解析"""
+import re
+
+# 匹配时间戳 [mm:ss.xx]
+TIME_STAMP = re.compile(r'\[(\d{2}):(\d{2})\.?\d*\]')
+TAG = re.compile(r'\[.*?\]')
+
+
+def parse_lyrics(lrc_text):
+    """解析歌词文本，返回按时间排序的 [(秒, 歌词), ...]"""
+    lyrics = []
+    for line in lrc_text.split('\n'):
+        if line.strip():
+            time_stamps = TIME_STAMP.findall(line)
+            text = TAG.sub('', line).strip()
+            if time_stamps and text:
+                for minute, second in time_stamps:
+                    time_seconds = int(minute) * 60 + int(second)
+                    lyrics.append((time_seconds, text))
+    return sorted(lyrics)  # 按时间排序
@@ -1,9 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
-import requests
-from PIL import Image, ImageTk
-from io import BytesIO
 from api import NetEaseAPI
+from image_loader import ImageLoader
 from player_window import PlayerWindow
 
 class MainWindow:
@@ -12,6 +10,7 @@ class MainWindow:
         self.root.title("网易云音乐")
         self.root.geometry("600x700")
         self.api = NetEaseAPI()
+        self.images = ImageLoader.get_instance()
         if cookie and user_id:
             self.api.set_user_info(cookie, user_id)  # 设置完整的用户信息
         self.setup_ui()
@@ -68,30 +67,26 @@ class MainWindow:
         card.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
 
         try:
-            # 获取并显示歌单封面
-            response = requests.get(playlist["picUrl"])
-            img = Image.open(BytesIO(response.content))
-            img = img.resize((120, 120))
-            photo = ImageTk.PhotoImage(img)
-            img_label = tk.Label(card, image=photo)
-            img_label.image = photo
+            # 先显示占位图，封面在后台加载
+            img_label = tk.Label(card)
             img_label.pack()
+            self.images.load_into(img_label, playlist.get("picUrl"), (120, 120), owner=self)
 
             # 显示歌单名称
             name_label = tk.Label(card, text=playlist["name"], wraplength=120, font=("微软雅黑", 9))
             name_label.pack()
 
             # 绑定点击事件
-            img_label.bind("<Button-1>", lambda e, pid=playlist["id"]: self.open_playlist(pid))
-            name_label.bind("<Button-1>", lambda e, pid=playlist["id"]: self.open_playlist(pid))
+            img_label.bind("<Button-1>", lambda e, p=playlist: self.open_playlist(p["id"], p))
+            name_label.bind("<Button-1>", lambda e, p=playlist: self.open_playlist(p["id"], p))
 
         except Exception as e:
             print(f"Error loading playlist card: {e}")
 
-    def open_playlist(self, playlist_id):
+    def open_playlist(self, playlist_id, summary=None):
         """打开歌单详情页面"""
         from playlist_detail import PlaylistDetailWindow
-        detail_window = PlaylistDetailWindow(self.api, playlist_id)
+        detail_window = PlaylistDetailWindow(self.api, playlist_id, summary)
         detail_window.run()
 
     def show_local(self):
@@ -115,6 +110,7 @@ class MainWindow:
         player = PlayerWindow.get_instance()
         if player and player.window.winfo_exists():
             player.on_closing() # 调用播放器窗口的关闭处理
+        self.images.cancel(self)
         self.root.destroy()
 
     def run(self):
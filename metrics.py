@@ -0,0 +1,158 @@
+"""接口调用统计：按接口记录次数、延迟分布、流量、错误码和缓存命中"""
+import json
+import logging
+import threading
+from bisect import bisect_left
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# 延迟直方图的桶上界，单位毫秒
+LATENCY_BUCKETS = (
+    1, 1.5, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300,
+    500, 750, 1000, 1500, 2000, 3000, 5000, 10000, 30000
+)
+
+
+class LatencyHistogram:
+    """固定桶的延迟直方图，分位数按桶内线性插值估算"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个桶收集超出上界的值
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i > 0 else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, low + (high - low) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.error_codes = Counter()
+        self.bytes = 0
+        self.cache_hits = 0
+        self.latency = LatencyHistogram()
+
+    def to_dict(self):
+        latency = self.latency
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "error_codes": dict(self.error_codes),
+            "bytes": self.bytes,
+            "cache_hits": self.cache_hits,
+            "latency_ms": {
+                "mean": round(latency.total / latency.count, 2) if latency.count else 0.0,
+                "p50": round(latency.percentile(50), 2),
+                "p95": round(latency.percentile(95), 2),
+                "p99": round(latency.percentile(99), 2),
+                "max": round(latency.max, 2)
+            }
+        }
+
+
+class Metrics:
+    """线程安全的接口统计表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._server = None
+
+    def _stats(self, endpoint):
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = EndpointStats()
+        return stats
+
+    def record_request(self, endpoint, latency, status=None, nbytes=0):
+        """记录一次网络请求，status为HTTP状态码或异常名称"""
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats.count += 1
+            stats.bytes += nbytes
+            stats.latency.observe(latency * 1000)
+            if not isinstance(status, int) or status >= 400:
+                stats.errors += 1
+                stats.error_codes[str(status)] += 1
+
+    def record_error_code(self, endpoint, code):
+        """记录接口返回的业务错误码（HTTP成功但code不是200）"""
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats.errors += 1
+            stats.error_codes[str(code)] += 1
+
+    def record_cache_hit(self, endpoint, count=1):
+        with self._lock:
+            self._stats(endpoint).cache_hits += count
+
+    def snapshot(self):
+        """返回 {接口: 统计} 字典"""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self._endpoints.items())}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def dump(self, path):
+        """把当前统计写入JSON文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def serve(self, port=9100, host="127.0.0.1"):
+        """在后台线程启动本地HTTP服务，GET /metrics 返回JSON统计"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info("Metrics available at http://%s:%d/metrics", host, self._server.server_address[1])
+        return self._server
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# 进程内共享的默认统计表，所有 NetEaseAPI 实例默认写入这里
+REGISTRY = Metrics()
@@ -0,0 +1,414 @@
+"""本地模拟的 NeteaseCloudMusicAPI 服务器，用于离线调试和性能测试
+
+覆盖 NetEaseAPI 用到的所有接口，并提供封面图片和音频文件。
+支持配置延迟、带宽和错误注入；录制模式会把真实服务器的响应保存为
+fixture 文件，之后可离线回放。
+
+用法:
+    python mock_server.py --port 3000 --latency 0.05 --bandwidth 500000
+    python mock_server.py --record http://localhost:3001 --fixtures fixtures
+    python mock_server.py --fixtures fixtures
+"""
+import argparse
+import array
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import urlparse, parse_qs, urlencode
+
+# 计算fixture键时忽略的参数（每次请求都不同）
+VOLATILE_PARAMS = {"timestamp"}
+
+# 写出响应正文时每次写入的字节数，用于带宽限制
+WRITE_CHUNK = 16 * 1024
+
+
+def fake_song(song_id, base_url="", duration_ms=180000):
+    """生成一首假歌曲"""
+    song_id = int(song_id)
+    return {
+        "id": song_id,
+        "name": f"歌曲{song_id}",
+        "ar": [{"id": song_id % 97 + 1, "name": f"歌手{song_id % 97 + 1}"}],
+        "al": {
+            "id": song_id % 501 + 1,
+            "name": f"专辑{song_id % 501 + 1}",
+            "picUrl": f"{base_url}/media/cover/{song_id % 501 + 1}.jpg"
+        },
+        "dt": duration_ms
+    }
+
+
+def fake_playlist(playlist_id, base_url="", track_count=100):
+    """生成一个假歌单"""
+    playlist_id = int(playlist_id)
+    return {
+        "id": playlist_id,
+        "name": f"歌单{playlist_id}",
+        "coverImgUrl": f"{base_url}/media/cover/{playlist_id}.jpg",
+        "picUrl": f"{base_url}/media/cover/{playlist_id}.jpg",
+        "creator": {
+            "nickname": "创建者",
+            "avatarUrl": f"{base_url}/media/cover/avatar.jpg"
+        },
+        "trackCount": track_count,
+        "description": "模拟服务器生成的歌单"
+    }
+
+
+def fake_lyric(duration_ms, interval=5):
+    """每隔interval秒一行歌词"""
+    lines = []
+    for second in range(0, duration_ms // 1000, interval):
+        lines.append(f"[{second // 60:02d}:{second % 60:02d}.00]第{second // interval + 1}句歌词")
+    return "\n".join(lines)
+
+
+def make_cover(size, seed):
+    """生成纯色JPEG封面，没有Pillow时返回一段占位字节"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return b"\xff\xd8\xff\xd9"
+    rng = random.Random(seed)
+    color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+    buffer = BytesIO()
+    Image.new("RGB", (size, size), color).save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def make_audio(seconds, rate=22050):
+    """生成单声道16位正弦波WAV"""
+    samples = array.array("h", (
+        int(8000 * math.sin(2 * math.pi * 440 * i / rate)) for i in range(int(seconds * rate))
+    ))
+    buffer = BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def fixture_key(method, path, params):
+    items = sorted((k, v) for k, v in params.items() if k not in VOLATILE_PARAMS)
+    raw = f"{method} {path}?{urlencode(items)}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    # 使用HTTP/1.1以支持keep-alive
+    protocol_version = "HTTP/1.1"
+    # 头部和正文分开写出，关闭Nagle避免keep-alive连接上的延迟确认
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def mock(self):
+        return self.server.mock
+
+    @property
+    def base_url(self):
+        host = self.headers.get("Host") or "%s:%d" % self.server.server_address[:2]
+        return f"http://{host}"
+
+    def do_GET(self):
+        self.handle_request("GET", b"")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self.handle_request("POST", body)
+
+    def handle_request(self, method, body):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if method == "POST" and body:
+            params.update({k: v[-1] for k, v in parse_qs(body.decode("utf-8", "replace")).items()})
+
+        mock = self.mock
+        delay = mock.latency + (mock.rng.uniform(0, mock.jitter) if mock.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        if mock.error_rate and mock.rng.random() < mock.error_rate:
+            self.send_json({"code": 503, "msg": "mock error"}, status=503)
+            return
+
+        if url.path.startswith("/media/"):
+            self.handle_media(url.path, params)
+            return
+
+        key = fixture_key(method, url.path, params)
+        if mock.upstream:
+            status, data = self.proxy(method, url, body)
+            mock.save_fixture(key, method, url.path, params, status, data)
+            self.send_json(data, status=status)
+            return
+        fixture = mock.load_fixture(key)
+        if fixture is not None:
+            self.send_json(fixture["body"], status=fixture.get("status", 200))
+            return
+        self.send_json(self.build_response(url.path, params))
+
+    def proxy(self, method, url, body):
+        """把请求转发给真实服务器"""
+        target = self.mock.upstream.rstrip("/") + url.path + (f"?{url.query}" if url.query else "")
+        headers = {}
+        if self.headers.get("Cookie"):
+            headers["Cookie"] = self.headers["Cookie"]
+        if body:
+            headers["Content-Type"] = self.headers.get("Content-Type", "application/x-www-form-urlencoded")
+        request = urllib.request.Request(target, data=body or None, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b"{}")
+
+    def build_response(self, path, params):
+        """根据接口路径构造响应"""
+        mock = self.mock
+        base = self.base_url
+        duration_ms = int(mock.audio_seconds * 1000)
+
+        if path == "/login/cellphone":
+            return {"code": 200, "cookie": "MUSIC_U=mock; __csrf=mock", "account": {"id": mock.user_id}}
+        if path == "/login/qr/key":
+            return {"code": 200, "data": {"code": 200, "unikey": "mock-key"}}
+        if path == "/login/qr/create":
+            return {"code": 200, "data": {"qrurl": f"{base}/login?key={params.get('key', '')}", "qrimg": ""}}
+        if path == "/login/qr/check":
+            return {"code": 803, "message": "授权登陆成功", "cookie": "MUSIC_U=mock; __csrf=mock"}
+        if path == "/login/status":
+            return {"data": {"code": 200, "account": {"id": mock.user_id}, "profile": {"userId": mock.user_id}}}
+        if path == "/personalized":
+            limit = int(params.get("limit", 30))
+            return {"code": 200, "result": [fake_playlist(i, base, mock.track_count) for i in range(1, limit + 1)]}
+        if path == "/user/playlist":
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", 30))
+            ids = range(offset + 1, min(offset + limit, mock.playlist_count) + 1)
+            return {
+                "code": 200,
+                "more": offset + limit < mock.playlist_count,
+                "playlist": [fake_playlist(i, base, mock.track_count) for i in ids]
+            }
+        if path == "/playlist/detail":
+            playlist = fake_playlist(params.get("id", 1), base, mock.track_count)
+            playlist["trackUpdateTime"] = mock.track_update_time
+            playlist["trackIds"] = [{"id": i} for i in range(1, mock.track_count + 1)]
+            playlist["tracks"] = [fake_song(i, base, duration_ms) for i in range(1, min(mock.track_count, 20) + 1)]
+            return {"code": 200, "playlist": playlist}
+        if path == "/playlist/track/all":
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", mock.track_count))
+            ids = range(offset + 1, min(offset + limit, mock.track_count) + 1)
+            return {"code": 200, "songs": [fake_song(i, base, duration_ms) for i in ids]}
+        if path == "/song/detail":
+            ids = [i for i in params.get("ids", "").split(",") if i]
+            return {
+                "code": 200,
+                "songs": [fake_song(i, base, duration_ms) for i in ids],
+                "privileges": [{"id": int(i), "maxbr": 320000} for i in ids]
+            }
+        if path == "/song/url":
+            ids = [i for i in params.get("id", "").split(",") if i]
+            size = len(mock.audio())
+            return {"code": 200, "data": [
+                {"id": int(i), "url": f"{base}/media/audio/{i}.wav", "size": size,
+                 "type": "wav", "level": params.get("level", "standard")}
+                for i in ids
+            ]}
+        if path == "/lyric":
+            return {"code": 200, "lrc": {"lyric": fake_lyric(duration_ms)}}
+        return {"code": 404, "msg": f"mock server does not implement {path}"}
+
+    def handle_media(self, path, params):
+        """封面图片和音频文件，音频支持Range请求"""
+        match = re.match(r"/media/cover/(\w+)\.jpg$", path)
+        if match:
+            size = self.mock.cover_size
+            param = re.match(r"(\d+)y(\d+)$", params.get("param", ""))
+            if param:
+                size = int(param.group(1))
+            self.send_bytes(self.mock.cover(size, match.group(1)), "image/jpeg")
+            return
+        if re.match(r"/media/audio/\d+\.wav$", path):
+            self.send_bytes(self.mock.audio(), "audio/wav", allow_range=True)
+            return
+        self.send_json({"code": 404}, status=404)
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_bytes(body, "application/json; charset=utf-8", status=status)
+
+    def send_bytes(self, body, content_type, status=200, allow_range=False):
+        total = len(body)
+        start, end = 0, total - 1
+        match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", "")) if allow_range else None
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), total - 1) if match.group(2) else total - 1
+            if start >= total:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{total}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start + 1))
+        if allow_range:
+            self.send_header("Accept-Ranges", "bytes")
+        if match:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        self.end_headers()
+        self.write_throttled(memoryview(body)[start:end + 1])
+
+    def write_throttled(self, data):
+        """按配置的带宽分块写出"""
+        bandwidth = self.mock.bandwidth
+        if not bandwidth:
+            self.wfile.write(data)
+            return
+        for offset in range(0, len(data), WRITE_CHUNK):
+            chunk = data[offset:offset + WRITE_CHUNK]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / bandwidth)
+
+
+class MockServer:
+    """在后台线程中运行的模拟服务器
+
+    latency/jitter: 每个请求的固定延迟和随机附加延迟（秒）
+    bandwidth: 响应正文的传输速率（字节/秒），0表示不限
+    error_rate: 随机返回503的概率
+    upstream: 录制模式下转发的真实服务器地址
+    fixtures: fixture目录，录制时写入，回放时优先读取
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 bandwidth=0, error_rate=0.0, track_count=100, playlist_count=40,
+                 audio_seconds=10, cover_size=1000, upstream=None, fixtures=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.track_count = track_count
+        self.playlist_count = playlist_count
+        self.track_update_time = 1700000000000
+        self.audio_seconds = audio_seconds
+        self.cover_size = cover_size
+        self.user_id = 1
+        self.upstream = upstream
+        self.fixtures = fixtures
+        self.rng = random.Random(seed)
+        self._media_lock = threading.Lock()
+        self._covers = {}
+        self._audio = None
+        if fixtures and not os.path.exists(fixtures):
+            os.makedirs(fixtures)
+
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def cover(self, size, name):
+        key = (size, name)
+        with self._media_lock:
+            if key not in self._covers:
+                self._covers[key] = make_cover(size, name)
+            return self._covers[key]
+
+    def audio(self):
+        with self._media_lock:
+            if self._audio is None:
+                self._audio = make_audio(self.audio_seconds)
+            return self._audio
+
+    def fixture_path(self, key):
+        return os.path.join(self.fixtures, f"{key}.json")
+
+    def load_fixture(self, key):
+        if not self.fixtures:
+            return None
+        path = self.fixture_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_fixture(self, key, method, path, params, status, body):
+        if not self.fixtures:
+            return
+        params = {k: v for k, v in params.items() if k not in VOLATILE_PARAMS}
+        with open(self.fixture_path(key), "w", encoding="utf-8") as f:
+            json.dump({"method": method, "path": path, "params": params,
+                       "status": status, "body": body}, f, ensure_ascii=False, indent=1)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟的 NeteaseCloudMusicAPI 服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机附加延迟上限（秒）")
+    parser.add_argument("--bandwidth", type=int, default=0, help="传输速率（字节/秒），0为不限")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回503的概率")
+    parser.add_argument("--tracks", type=int, default=100, help="每个歌单的歌曲数")
+    parser.add_argument("--playlists", type=int, default=40, help="用户歌单数")
+    parser.add_argument("--audio-seconds", type=float, default=10, help="音频时长（秒）")
+    parser.add_argument("--record", metavar="UPSTREAM", help="录制模式：转发到真实服务器并保存fixture")
+    parser.add_argument("--fixtures", help="fixture目录")
+    args = parser.parse_args()
+
+    server = MockServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        bandwidth=args.bandwidth, error_rate=args.error_rate, track_count=args.tracks,
+        playlist_count=args.playlists, audio_seconds=args.audio_seconds,
+        upstream=args.record, fixtures=args.fixtures
+    )
+    print(f"Mock API server running at {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,83 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-import requests
-from io import BytesIO
+import threading
+from image_loader import ImageLoader
+
+# 卡片布局：两栏，每行高度固定，便于根据滚动位置直接算出可见的行
+COLUMNS = 2
+CARD_HEIGHT = 100
+ROW_HEIGHT = CARD_HEIGHT + 10
+CARD_PADX = 20
+# 可见区域上下额外保留的行数，滚动时减少卡片的创建和回收
+OVERSCAN_ROWS = 2
+
+
+class PlaylistCard:
+    """一张可复用的歌单卡片，滚动时绑定到不同的歌单上"""
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.playlist = None
+        bg = owner.window.cget('bg')
+        self.frame = tk.Frame(owner.canvas, relief=tk.RAISED, borderwidth=1, bg=bg)
+        self.item = owner.canvas.create_window(0, 0, window=self.frame, anchor="nw", height=CARD_HEIGHT)
+
+        # 左侧信息区域（封面和标题）
+        left_frame = tk.Frame(self.frame)
+        left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10)
+
+        self.cover_label = tk.Label(left_frame)
+        self.cover_label.pack(side=tk.LEFT, padx=10)
+
+        # 右侧信息区域
+        info_frame = tk.Frame(left_frame)
+        info_frame.pack(side=tk.LEFT, fill=tk.BOTH, padx=10)
+
+        # 歌单名称
+        self.name_label = tk.Label(
+            info_frame,
+            font=("微软雅黑", 12, "bold"),
+            wraplength=250,
+            justify=tk.LEFT
+        )
+        self.name_label.pack(anchor="w", pady=2)
+
+        # 创建者信息
+        self.creator_label = tk.Label(info_frame, font=("微软雅黑", 10), fg="gray")
+        self.creator_label.pack(anchor="w", pady=2)
+
+        # 歌曲数量
+        self.count_label = tk.Label(info_frame, font=("微软雅黑", 10), fg="gray")
+        self.count_label.pack(anchor="w")
+
+        # 事件只绑定一次，点击时读取卡片当前对应的歌单
+        for widget in [self.frame, self.cover_label, self.name_label, self.creator_label, self.count_label]:
+            widget.bind("<Button-1>", self.on_click)
+            widget.bind("<Enter>", lambda e: owner.on_hover(self.frame))
+            widget.bind("<Leave>", lambda e: owner.on_leave(self.frame))
+
+    def show(self, playlist):
+        """显示指定歌单，封面通过图片加载器异步加载"""
+        if self.playlist is playlist:
+            return
+        self.playlist = playlist
+        self.name_label.config(text=playlist["name"])
+        creator = f"by {playlist['creator']['nickname']}" if playlist.get('creator') else ""
+        self.creator_label.config(text=creator)
+        self.count_label.config(text=f"{playlist['trackCount']}首歌曲")
+        self.owner.images.load_into(self.cover_label, playlist.get('coverImgUrl'), (80, 80), owner=self.owner)
+
+    def place(self, x, y, width):
+        self.owner.canvas.coords(self.item, x, y)
+        self.owner.canvas.itemconfigure(self.item, width=width, state="normal")
+
+    def hide(self):
+        self.owner.canvas.itemconfigure(self.item, state="hidden")
+
+    def on_click(self, event):
+        if self.playlist is not None:
+            self.owner.open_playlist(self.playlist["id"], self.playlist)
+
 
 class MyMusicWindow:
     def __init__(self, api):
@@ -10,58 +85,49 @@ class MyMusicWindow:
         self.window.title("我的音乐")
         self.window.geometry("1000x600")  # 增加窗口宽度
         self.api = api
+        self.images = ImageLoader.get_instance()
+        # 歌单数据和虚拟列表状态：只为可见的行创建卡片，滚出视野的卡片回收复用
+        self.playlists = []
+        self.visible_cards = {}  # 歌单下标 -> PlaylistCard
+        self.free_cards = []
+        self.column_width = 0
+        self.refresh_pending = False
+        self.load_token = 0
         self.setup_ui()
         self.load_playlists()
+        self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
 
     def setup_ui(self):
         # 我的音乐标题
         title_label = tk.Label(self.window, text="我的音乐", font=("微软雅黑", 16, "bold"))
-        title_label.pack(pady=10)                                                 
+        title_label.pack(pady=10)
 
         # 创建主滚动区域
         self.main_frame = ttk.Frame(self.window)
         self.main_frame.pack(fill='both', expand=True, padx=10, pady=5)
 
-        # 创建Canvas和滚动条
-        self.canvas = tk.Canvas(self.main_frame, bg=self.window.cget('bg'))  # 设置背景色
+        # 创建Canvas和滚动条，卡片直接作为Canvas的窗口项摆放
+        self.canvas = tk.Canvas(self.main_frame, bg=self.window.cget('bg'), highlightthickness=0)
         self.scrollbar = ttk.Scrollbar(self.main_frame, orient="vertical", command=self.canvas.yview)
-        
-        # 创建放置歌单的框架
-        self.playlists_frame = tk.Frame(self.canvas, bg=self.window.cget('bg'))  # 设置背景色
-        
-        # 配置Canvas
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        
+
+        # 配置Canvas，视图变化时刷新可见的卡片
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+
         # 打包组件
         self.scrollbar.pack(side="right", fill="y")
         self.canvas.pack(side="left", fill="both", expand=True)
-        
-        # 在Canvas中创建窗口
-        self.canvas_window = self.canvas.create_window(
-            (0, 0),
-            window=self.playlists_frame,
-            anchor="nw",
-            width=self.canvas.winfo_width()  # 设置内容框架宽度
-        )
+
+        # 加载状态提示
+        self.status_label = tk.Label(self.window, text="", font=("微软雅黑", 9), fg="gray")
+        self.status_label.pack(pady=(0, 5))
 
         # 绑定事件
         self.bind_events()
 
-        # 创建两栏的框架
-        self.left_column = tk.Frame(self.playlists_frame)
-        self.right_column = tk.Frame(self.playlists_frame)
-        self.left_column.grid(row=0, column=0, padx=10, sticky="nsew")
-        self.right_column.grid(row=0, column=1, padx=10, sticky="nsew")
-
-        # 配置网格列权重
-        self.playlists_frame.grid_columnconfigure(0, weight=1)
-        self.playlists_frame.grid_columnconfigure(1, weight=1)
-
     def bind_events(self):
         """绑定所有需要的事件"""
         # 绑定鼠标滚轮事件
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
-        self.playlists_frame.bind("<Configure>", self._on_frame_configure)
         self.canvas.bind("<Configure>", self._on_canvas_configure)
 
         # 进入离开画布区域时绑定/解绑滚轮事件
@@ -72,14 +138,18 @@ class MyMusicWindow:
         """处理鼠标滚轮事件"""
         self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
-    def _on_frame_configure(self, event):
-        """当内容框架大小改变时，更新画布滚动区域"""
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+    def _on_scroll(self, first, last):
+        """Canvas视图变化时更新滚动条并刷新可见卡片"""
+        self.scrollbar.set(first, last)
+        self.schedule_refresh()
 
     def _on_canvas_configure(self, event):
-        """当画布大小改变时，调整内容框架宽度"""
-        # 更新内容框架的宽度以匹配画布
-        self.canvas.itemconfig(self.canvas_window, width=event.width)
+        """当画布大小改变时，重新计算列宽并摆放卡片"""
+        self.column_width = max(1, (event.width - CARD_PADX * (COLUMNS + 1)) // COLUMNS)
+        for index, card in self.visible_cards.items():
+            self.place_card(card, index)
+        self.update_scrollregion()
+        self.schedule_refresh()
 
     def _bind_mousewheel(self, event):
         """绑定鼠标滚轮事件"""
@@ -89,79 +159,46 @@ class MyMusicWindow:
         """解绑鼠标滚轮事件"""
         self.canvas.unbind_all("<MouseWheel>")
 
-    def create_playlist_card(self, playlist, parent, row):
-        # 创建卡片框架
-        frame = tk.Frame(
-            parent,
-            relief=tk.RAISED,
-            borderwidth=1,
-            bg=self.window.cget('bg')
-        )
-        frame.grid(row=row, column=0, sticky="ew", pady=5, padx=10)  # 增加水平内边距
-        parent.grid_columnconfigure(0, weight=1)  # 使卡片填充整个列宽
+    def update_scrollregion(self):
+        rows = (len(self.playlists) + COLUMNS - 1) // COLUMNS
+        width = self.canvas.winfo_width()
+        self.canvas.configure(scrollregion=(0, 0, width, max(rows * ROW_HEIGHT, 1)))
 
-        try:
-            # 左侧信息区域（封面和标题）
-            left_frame = tk.Frame(frame)
-            left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10)  # 增加内边距
-            
-            # 获取歌单封面
-            try:
-                response = requests.get(playlist.get('coverImgUrl', ''))
-                image = Image.open(BytesIO(response.content))
-            except:
-                # 如果无法加载图片，可以创建一个空白图片
-                image = Image.new('RGB', (60, 60), color='gray')
-            
-            # 分类歌单
-            image = image.resize((80, 80))  # 增大封面尺寸
-            photo = ImageTk.PhotoImage(image)
-            
-            cover_label = tk.Label(left_frame, image=photo)
-            cover_label.image = photo
-            cover_label.pack(side=tk.LEFT, padx=10)
-
-            # 右侧信息区域
-            info_frame = tk.Frame(left_frame)
-            info_frame.pack(side=tk.LEFT, fill=tk.BOTH, padx=10)
-
-            # 歌单名称
-            name_label = tk.Label(
-                info_frame, 
-                text=playlist["name"],
-                font=("微软雅黑", 12, "bold"),  # 修改字体
-                wraplength=250,  # 增加文本宽度
-                justify=tk.LEFT
-            )
-            name_label.pack(anchor="w", pady=2)
-
-            # 创建者信息
-            creator = f"by {playlist['creator']['nickname']}" if playlist.get('creator') else ""
-            creator_label = tk.Label(
-                info_frame,
-                text=creator,
-                font=("微软雅黑", 10), # 修改字体
-                fg="gray"
-            )
-            creator_label.pack(anchor="w", pady=2)
-
-            # 歌曲数量
-            count_label = tk.Label(
-                info_frame,
-                text=f"{playlist['trackCount']}首歌曲",
-                font=("微软雅黑", 10), # 修改字体
-                fg="gray"
-            )
-            count_label.pack(anchor="w")
-
-            # 绑定点击事件
-            for widget in [frame, cover_label, name_label, creator_label, count_label]:
-                widget.bind("<Button-1>", lambda e, pid=playlist["id"]: self.open_playlist(pid))
-                widget.bind("<Enter>", lambda e, w=frame: self.on_hover(w))
-                widget.bind("<Leave>", lambda e, w=frame: self.on_leave(w))
+    def schedule_refresh(self):
+        """合并同一轮事件中的多次刷新请求"""
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.window.after_idle(self.refresh_visible)
 
-        except Exception as e:
-            print(f"加载歌单失败: {e}")
+    def refresh_visible(self):
+        """只为可见区域（及上下少量缓冲行）内的歌单绑定卡片"""
+        self.refresh_pending = False
+        if not self.window.winfo_exists() or not self.column_width:
+            return
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first_row = max(0, int(top // ROW_HEIGHT) - OVERSCAN_ROWS)
+        last_row = int(bottom // ROW_HEIGHT) + OVERSCAN_ROWS
+        wanted = range(first_row * COLUMNS, min(len(self.playlists), (last_row + 1) * COLUMNS))
+
+        # 回收滚出范围的卡片
+        for index in [i for i in self.visible_cards if i not in wanted]:
+            card = self.visible_cards.pop(index)
+            card.hide()
+            self.free_cards.append(card)
+
+        for index in wanted:
+            card = self.visible_cards.get(index)
+            if card is None:
+                card = self.free_cards.pop() if self.free_cards else PlaylistCard(self)
+                self.visible_cards[index] = card
+                self.place_card(card, index)
+            card.show(self.playlists[index])
+
+    def place_card(self, card, index):
+        row, col = divmod(index, COLUMNS)
+        x = CARD_PADX + col * (self.column_width + CARD_PADX)
+        card.place(x, row * ROW_HEIGHT + 5, self.column_width)
 
     def on_hover(self, widget):
         """鼠标悬停效果"""
@@ -172,26 +209,58 @@ class MyMusicWindow:
         widget.configure(relief=tk.RAISED, bg=self.window.cget('bg'))
 
     def load_playlists(self):
-        response = self.api.get_user_playlists()
-        if response.get("code") == 200:
-            playlists = response["playlist"]
-            
-            # 清空现有内容
-            for widget in self.left_column.winfo_children():
-                widget.destroy()
-            for widget in self.right_column.winfo_children():
-                widget.destroy()
-
-            # 分两栏显示歌单
-            for i, playlist in enumerate(playlists):
-                parent = self.left_column if i % 2 == 0 else self.right_column
-                row = i // 2
-                self.create_playlist_card(playlist, parent, row)
-
-    def open_playlist(self, playlist_id):
+        """在后台线程分页获取全部歌单，每到一页就追加到列表"""
+        self.load_token += 1
+        self.playlists = []
+        for card in self.visible_cards.values():
+            card.hide()
+            self.free_cards.append(card)
+        self.visible_cards.clear()
+        self.update_scrollregion()
+        self.status_label.config(text="正在加载歌单...")
+        threading.Thread(target=self._fetch_playlists, args=(self.load_token,), daemon=True).start()
+
+    def _fetch_playlists(self, token):
+        """后台线程：逐页获取歌单并交给Tk线程"""
+        error = None
+        try:
+            for page in self.api.iter_user_playlists():
+                if token != self.load_token:
+                    return
+                self.window.after(0, lambda p=page: self.append_playlists(p, token))
+        except Exception as e:
+            error = str(e)
+        if token == self.load_token:
+            self.window.after(0, lambda: self.finish_playlists(token, error))
+
+    def append_playlists(self, playlists, token):
+        if token != self.load_token:
+            return
+        self.playlists.extend(playlists)
+        self.update_scrollregion()
+        self.status_label.config(text=f"已加载 {len(self.playlists)} 个歌单...")
+        self.schedule_refresh()
+
+    def finish_playlists(self, token, error):
+        if token != self.load_token:
+            return
+        if error:
+            print(f"加载歌单失败: {error}")
+            self.status_label.config(text=f"加载歌单失败，已显示 {len(self.playlists)} 个")
+        else:
+            self.status_label.config(text=f"共 {len(self.playlists)} 个歌单")
+
+    def open_playlist(self, playlist_id, summary=None):
         from playlist_detail import PlaylistDetailWindow
-        detail_window = PlaylistDetailWindow(self.api, playlist_id)
+        detail_window = PlaylistDetailWindow(self.api, playlist_id, summary)
         detail_window.run()
 
+    def on_closing(self):
+        """关闭窗口时停止加载并取消未完成的封面加载"""
+        self.load_token += 1
+        self.images.cancel(self)
+        self.canvas.unbind_all("<MouseWheel>")
+        self.window.destroy()
+
     def run(self):
         self.window.mainloop()
@@ -0,0 +1,199 @@
+"""进程内播放引擎：封装 vlc.MediaPlayer，由界面定时读取播放位置和状态"""
+import ctypes
+import itertools
+import logging
+import time
+
+import vlc
+
+logger = logging.getLogger(__name__)
+
+# libvlc报告的播放时间每隔几百毫秒才更新一次，两次更新之间用单调时钟推算，最多推算这么多秒
+MAX_EXTRAPOLATION = 1.0
+
+# 边下载边播放时，VLC通过下面四个回调向 StreamBuffer 要数据。
+# 回调只能拿到一个整数opaque：打开媒体时它是媒体的key，打开后换成读取端的key。
+# VLC每打开一次媒体（预解析、播放）都会得到一个独立的 StreamReader。
+_streams = {}  # 媒体key -> StreamBuffer
+_readers = {}  # 读取端key -> (媒体key, StreamReader)
+_keys = itertools.count(1)
+_UNKNOWN_SIZE = 2 ** 64 - 1
+
+
+@vlc.CallbackDecorators.MediaOpenCb
+def _open_stream(opaque, datap, sizep):
+    stream = _streams.get(opaque or 0)
+    if stream is None:
+        return -1
+    key = next(_keys)
+    _readers[key] = (opaque, stream.reader())
+    datap.contents.value = key
+    sizep.contents.value = stream.total or _UNKNOWN_SIZE
+    return 0
+
+
+@vlc.CallbackDecorators.MediaReadCb
+def _read_stream(opaque, buf, length):
+    entry = _readers.get(opaque or 0)
+    if entry is None:
+        return -1
+    data = entry[1].read(length)
+    if data is None:
+        return -1
+    ctypes.memmove(buf, data, len(data))
+    return len(data)
+
+
+@vlc.CallbackDecorators.MediaSeekCb
+def _seek_stream(opaque, offset):
+    entry = _readers.get(opaque or 0)
+    if entry is None:
+        return -1
+    entry[1].seek(offset)
+    return 0
+
+
+@vlc.CallbackDecorators.MediaCloseCb
+def _close_stream(opaque):
+    entry = _readers.pop(opaque or 0, None)
+    if entry is not None:
+        entry[1].release()
+
+
+class StreamMedia:
+    """从 StreamBuffer 读取数据的VLC媒体，可以在播放前提前创建和解析"""
+
+    def __init__(self, instance, stream):
+        self.stream = stream
+        self.key = next(_keys)
+        _streams[self.key] = stream
+        self.media = instance.media_new_callbacks(
+            _open_stream, _read_stream, _seek_stream, _close_stream, ctypes.c_void_p(self.key))
+
+    def parse(self):
+        """在VLC的后台线程中探测格式和时长，播放时可以直接开始解码"""
+        try:
+            self.media.parse_with_options(vlc.MediaParseFlag.network, 0)
+        except Exception as e:
+            logger.debug("预解析失败: %s", e)
+
+    def close_readers(self):
+        """唤醒正阻塞在 read() 中的VLC线程"""
+        for media_key, reader in list(_readers.values()):
+            if media_key == self.key:
+                reader.close()
+
+    def release(self):
+        self.close_readers()
+        _streams.pop(self.key, None)
+        self.media.release()
+
+
+class PlaybackEngine:
+    """基于 libvlc 的播放器，整个程序只需一个实例
+
+    不注册VLC事件：VLC在自己的线程中触发事件，还要再转交回Tk线程。
+    界面用一个定时器调用 get_position()、is_ended() 等方法轮询即可，这些方法都很轻量。
+    """
+
+    def __init__(self):
+        self.instance = vlc.Instance("--no-video", "--quiet")
+        self.player = self.instance.media_player_new()
+        self.stream_media = None  # 当前播放的 StreamMedia
+        self._clock_ms = -1  # 上次读到的libvlc时间及读到它的单调时钟时间
+        self._clock_at = 0.0
+        self._position = 0.0  # 上次返回的位置，推算值不会让位置倒退
+        self._seek_from = None  # 跳转前libvlc的时间，跳转生效前读到的仍是它
+        self._seek_to = 0
+
+    def prepare_stream(self, stream):
+        """提前为下一首创建并解析媒体，返回的 StreamMedia 交给 load_stream 或 release"""
+        media = StreamMedia(self.instance, stream)
+        media.parse()
+        return media
+
+    def load_stream(self, stream, prepared=None):
+        """从正在下载的 StreamBuffer 播放，数据还没到时VLC的读取线程会等待"""
+        self.stop()
+        if prepared is None or prepared.stream is not stream:
+            if prepared is not None:
+                prepared.release()
+            prepared = StreamMedia(self.instance, stream)
+        self.stream_media = prepared
+        self.player.set_media(prepared.media)
+        self._reset_clock()
+        if self.player.play() == -1:
+            raise RuntimeError(f"无法播放: {stream.url}")
+
+    def pause(self):
+        self.player.set_pause(1)
+
+    def resume(self):
+        if self.player.get_state() in (vlc.State.Paused, vlc.State.Stopped, vlc.State.Ended):
+            self.player.play()
+        self.player.set_pause(0)
+
+    def stop(self):
+        """停止播放并释放当前媒体"""
+        if self.stream_media is not None:
+            # 先唤醒可能正阻塞在 read() 中的VLC线程，否则 player.stop() 会一直等它
+            self.stream_media.close_readers()
+        self.player.stop()
+        if self.stream_media is not None:
+            self.stream_media.release()
+            self.stream_media = None
+
+    def seek(self, seconds):
+        """跳转到指定秒数，不需要重新打开文件"""
+        ms = int(seconds * 1000)
+        self._reset_clock()
+        # set_time 要等libvlc的输入线程处理后才生效，在此之前 get_time() 仍返回跳转前的时间
+        self._seek_from = self.player.get_time()
+        self._seek_to = ms
+        self.player.set_time(ms)
+
+    def get_position(self):
+        """平滑的播放位置（秒）：libvlc的时间变化时以它为准，没变化时按单调时钟向前推算"""
+        ms = self.player.get_time()
+        if self._seek_from is not None:
+            if ms == self._seek_from:
+                ms = self._seek_to  # 跳转还没生效，按跳转目标计算
+            else:
+                self._seek_from = None
+        if ms < 0:
+            return 0
+        now = time.monotonic()
+        if ms != self._clock_ms:
+            self._clock_ms = ms
+            self._clock_at = now
+            self._position = ms / 1000
+        elif self.player.is_playing():
+            # 只限制推算值：不超过 MAX_EXTRAPOLATION，也不让位置倒退
+            position = ms / 1000 + min(now - self._clock_at, MAX_EXTRAPOLATION)
+            self._position = max(position, self._position)
+        else:
+            self._clock_at = now  # 暂停或缓冲时不推算
+            self._position = ms / 1000
+        return self._position
+
+    def _reset_clock(self):
+        self._clock_ms = -1
+        self._position = 0.0
+        self._seek_from = None
+
+    def get_length(self):
+        """当前歌曲时长（秒），未知时为0"""
+        return max(0, self.player.get_length()) / 1000
+
+    def is_ended(self):
+        """当前媒体是否已播放完"""
+        return self.player.get_state() == vlc.State.Ended
+
+    def has_failed(self):
+        """当前媒体是否播放出错"""
+        return self.player.get_state() == vlc.State.Error
+
+    def release(self):
+        self.stop()
+        self.player.release()
+        self.instance.release()
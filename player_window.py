@@ -1,16 +1,45 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-import requests
-from io import BytesIO
-import re
-import os
-import uuid
-import vlc
-import subprocess
+import asyncio
 import threading
-import psutil
-import time
+from bisect import bisect_right
+from api import AsyncNetEaseAPI
+from audio_cache import create_default_audio_cache
+from image_loader import ImageLoader
+from lyrics import parse_lyrics
+from playback import PlaybackEngine
+from track import Track
+
+
+# 当前歌曲剩余这么多秒时开始准备下一首
+PREFETCH_SECONDS = 20
+# 播放定时器的间隔（毫秒），进度、歌词和播放结束都由它驱动
+TICK_INTERVAL = 100
+
+
+def format_time(seconds):
+    """秒数格式化为 mm:ss"""
+    seconds = int(seconds)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+class Prefetch:
+    """为下一首提前准备的数据：歌曲信息、歌词、下载中的音频和预解析的媒体"""
+
+    def __init__(self, index, song_id):
+        self.index = index
+        self.song_id = song_id
+        self.song = None
+        self.lyric_result = None
+        self.stream = None
+        self.media = None
+
+    def cancel(self):
+        if self.stream is not None:
+            self.stream.cancel()
+        if self.media is not None:
+            self.media.release()
+
 
 class PlayerWindow:
     _instance = None
@@ -33,6 +62,8 @@ class PlayerWindow:
         self.window.protocol("WM_DELETE_WINDOW", self.hide_window)
         
         self.api = api
+        self.async_api = AsyncNetEaseAPI(api)
+        self.images = ImageLoader.get_instance()
         
         # 播放列表管理
         self.playlist = []
@@ -46,28 +77,35 @@ class PlayerWindow:
         
         # 添加歌词解析变量
         self.lyrics = []  # [(time, text), ...]
+        self.lyric_times = []  # 各句歌词的开始时间，用于二分查找
         self.current_lyric_index = -1
         
-        # 添加音频处理临时目录
-        self.temp_dir = self.create_temp_dir()
-        self.current_audio = None
+        # 播放过的音频按歌曲缓存在磁盘上，重播不需要再下载
+        self.audio_cache = create_default_audio_cache()
         
-        # VLC相关
-        self._vlc_instance = vlc.Instance()
-        self._vlc_player = None
-        self._media = None
-        self._media_path = None
-        self._duration = 0
-        self._progress_updating = False
-        self._seek_by_user = False
-        self.vlc_process = None
+        # 进程内播放引擎，播放位置、时长和结束状态由 tick() 定时读取
+        self.engine = PlaybackEngine()
+        self.tick_job = None
+        self.shown_progress = None  # 界面上正在显示的值，没变化时不刷新控件
+        self.shown_time = None
+        self.shown_duration = None
+        self._progress_updating = False  # 程序设置进度条时为True，避免被当作用户拖动
         self.current_file = None
-        self.monitor_thread = None
-        self.progress_update_id = None  # 添加进度更新ID追踪
+        self.stream = None  # 正在下载的 StreamBuffer
+        # 下一首的预加载，播放模式或播放列表变化时取消
+        self.prefetch = None
+        self.next_index = None  # 随机播放时提前选定的下一首
 
         self.setup_ui()
         PlayerWindow._instance = self
 
+    def _dispatch(self, func, *args):
+        """从下载线程把回调交给Tk线程执行"""
+        try:
+            self.window.after(0, func, *args)
+        except (RuntimeError, tk.TclError):
+            pass  # 窗口已销毁
+
     def hide_window(self):
         """隐藏窗口而不是销毁"""
         self.window.withdraw()
@@ -84,7 +122,7 @@ class PlayerWindow:
             return self
 
     def set_playlist(self, songs, current_id=None):
-        """设置播放列表"""
+        """设置播放列表，songs为Track列表，current_id为开始播放的歌曲id"""
         if not self.window.winfo_exists():
             # 如果窗口不存在，重新创建
             PlayerWindow._instance = None
@@ -93,13 +131,15 @@ class PlayerWindow:
             instance.show()
             return
             
+        self.cancel_prefetch()
         self.playlist = songs
         self.current_index = -1
         
         if current_id:
             # 从指定歌曲开始播放
-            for i, song in enumerate(songs):
-                if str(song["id"]) == str(current_id):
+            current_id = int(current_id)
+            for i, track in enumerate(songs):
+                if track.id == current_id:
                     self.current_index = i
                     break
         
@@ -173,6 +213,10 @@ class PlayerWindow:
         self.duration_label = tk.Label(self.progress_frame, text="00:00")
         self.duration_label.pack(side=tk.LEFT)
 
+        # 缓冲状态
+        self.buffer_label = tk.Label(self.progress_frame, text="", width=10, fg="gray")
+        self.buffer_label.pack(side=tk.LEFT, padx=(10, 0))
+
         # 播放控制
         self.control_frame = tk.Frame(self.left_frame)
         self.control_frame.pack(fill=tk.X, pady=20)
@@ -244,13 +288,10 @@ class PlayerWindow:
         lyric_scrollbar.config(command=self.lyric_text.yview)
 
     def on_progress_change(self, value):
-        """进度条改变处理"""
-        if self._vlc_player and self.total_time > 0:
-            self._seek_by_user = True
-            target_time = (float(value) * self.total_time) / 100
-            self._vlc_player.set_time(int(target_time * 1000))
-            self.current_time = int(target_time)
-            self.window.after(200, lambda: setattr(self, "_seek_by_user", False))
+        """用户拖动进度条时跳转；程序更新进度条引起的回调直接忽略"""
+        if self._progress_updating or not self.current_file or self.total_time <= 0:
+            return
+        self.seek(float(value) * self.total_time / 100)
 
     def toggle_play_mode(self):
         """切换播放模式"""
@@ -262,37 +303,32 @@ class PlayerWindow:
         text, mode = modes[self.play_mode]
         self.play_mode = mode
         self.mode_btn.config(text=text)
+        # 下一首由播放模式决定，已预加载的可能不再是下一首
+        self.cancel_prefetch()
 
     def toggle_play(self):
         """播放/暂停切换"""
-        if not self.vlc_process:
+        if not self.current_file:
             return
-        
         if self.is_playing:
-            # 发送空格键给VLC窗口来触发暂停
-            subprocess.run(['nircmd', 'sendkey', 'vlc.exe', 'space'])
-            self.play_btn.config(text="播放")
+            self.pause()
         else:
-            subprocess.run(['nircmd', 'sendkey', 'vlc.exe', 'space'])
-            self.play_btn.config(text="暂停")
-        
-        self.is_playing = not self.is_playing
+            self.resume()
 
     def pause(self):
         """暂停播放"""
-        if self._vlc_player and self.is_playing:
-            self._vlc_player.pause()
+        if self.current_file and self.is_playing:
+            self.engine.pause()
             self.is_playing = False
             self.play_btn.config(text="播放")
 
     def resume(self):
         """恢复播放"""
-        if self._vlc_player:
-            self._vlc_player.play()
+        if self.current_file:
+            self.engine.resume()
             self.is_playing = True
             self.play_btn.config(text="暂停")
-            self.update_progress()
-            self.update_lyrics_position()
+            self.schedule_tick()
 
     def play_previous(self):
         """播放上一首"""
@@ -301,6 +337,7 @@ class PlayerWindow:
             
         # 先停止当前播放
         self.stop_current_playback()
+        self.cancel_prefetch()
             
         if self.play_mode == "single":
             self.play_current()
@@ -315,14 +352,8 @@ class PlayerWindow:
     def play_current(self):
         """播放当前歌曲"""
         if self.current_index >= 0 and self.current_index < len(self.playlist):
-            song = self.playlist[self.current_index]
-            song_id = song["id"]
-            if self.load_song(song_id):
-                # 播放成功后更新歌词
-                self.update_lyrics_position()
-                self.highlight_current_lyric()
-                self.update_progress()
-                self.check_music_end()
+            track = self.playlist[self.current_index]
+            self.load_song(track.id)
         else:
             print("当前索引无效，无法播放歌曲")
 
@@ -334,95 +365,182 @@ class PlayerWindow:
         # 先停止当前播放
         self.stop_current_playback()
         
+        self.current_index = self.upcoming_index()
+        self.next_index = None
+        self.play_current()
+
+    def upcoming_index(self):
+        """下一首的下标：单曲循环为当前歌曲，随机播放时提前选定，预加载和切歌用同一个结果"""
         if self.play_mode == "single":
-            # 单曲循环
-            self.play_current()
-        elif self.play_mode == "random":
-            # 随机播放
-            import random
-            self.current_index = random.randint(0, len(self.playlist) - 1)
-            self.play_current()
-        else:
-            # 顺序播放
-            self.current_index = (self.current_index + 1) % len(self.playlist)
-            self.play_current()
+            return self.current_index
+        if self.play_mode == "random":
+            if self.next_index is None:
+                import random
+                self.next_index = random.randint(0, len(self.playlist) - 1)
+            return self.next_index
+        return (self.current_index + 1) % len(self.playlist)
+
+    def maybe_prefetch(self):
+        """当前歌曲快结束时，在后台获取下一首的信息并开始下载"""
+        if self.prefetch is not None or not self.playlist or self.total_time <= 0:
+            return
+        if self.total_time - self.current_time > PREFETCH_SECONDS:
+            return
+        index = self.upcoming_index()
+        self.prefetch = Prefetch(index, self.playlist[index].id)
+        cached = self.audio_cache.contains(self.prefetch.song_id)
+        threading.Thread(target=self._fetch_prefetch, args=(self.prefetch, cached), daemon=True).start()
+
+    def _fetch_prefetch(self, prefetch, cached):
+        """后台线程：获取下一首的详情、播放链接和歌词"""
+        try:
+            result = asyncio.run(self.fetch_song(prefetch.song_id, with_url=not cached))
+        except Exception as e:
+            print(f"预加载下一首失败: {e}")
+            return
+        self._dispatch(self._prefetch_resolved, prefetch, result)
+
+    def _prefetch_resolved(self, prefetch, result):
+        if prefetch is not self.prefetch:
+            return  # 已取消
+        song_detail, url_result, lyric_result = result
+        if song_detail.get("code") != 200 or not song_detail.get("songs"):
+            return
+        url = None
+        if url_result is not None:
+            if url_result.get("code") != 200 or not url_result["data"][0]["url"]:
+                return
+            url = url_result["data"][0]["url"]
+        prefetch.song = Track.from_song(song_detail["songs"][0])
+        prefetch.lyric_result = lyric_result
+        try:
+            prefetch.stream = self.open_stream(prefetch.song_id, url, self._prefetch_ready).start()
+        except Exception as e:
+            print(f"预加载下一首失败: {e}")
+
+    def _prefetch_ready(self, stream, ok):
+        """下一首缓冲就绪后提前创建并解析媒体，切歌时直接开始解码"""
+        prefetch = self.prefetch
+        if ok and prefetch is not None and prefetch.stream is stream and prefetch.media is None:
+            prefetch.media = self.engine.prepare_stream(stream)
+
+    def take_prefetch(self, song_id):
+        """取出与即将播放的歌曲对应的预加载，不对应时丢弃"""
+        prefetch, self.prefetch = self.prefetch, None
+        if prefetch is None:
+            return None
+        if (prefetch.song_id == song_id and prefetch.index == self.current_index
+                and prefetch.stream is not None and prefetch.stream.error is None):
+            return prefetch
+        prefetch.cancel()
+        return None
+
+    def cancel_prefetch(self):
+        self.next_index = None
+        if self.prefetch is not None:
+            self.prefetch.cancel()
+            self.prefetch = None
+
+    def schedule_tick(self):
+        if self.tick_job is None:
+            self.tick_job = self.window.after(TICK_INTERVAL, self.tick)
+
+    def cancel_tick(self):
+        if self.tick_job is not None:
+            self.window.after_cancel(self.tick_job)
+            self.tick_job = None
+
+    def tick(self):
+        """唯一的播放定时器：读取引擎的真实播放位置，刷新进度和歌词，检测播放结束"""
+        self.tick_job = None
+        if not self.current_file:
+            return
+        if self.engine.is_ended():
+            self.on_song_complete()
+            return
+        if self.engine.has_failed():
+            self.on_playback_error()
+            return
+        self.total_time = self.engine.get_length()
+        self.current_time = self.engine.get_position()
+        self.update_progress()
+        self.update_lyrics_position()
+        self.maybe_prefetch()
+        self.schedule_tick()
 
     def update_progress(self):
-        """更新进度条"""
-        # 取消之前的进度更新定时器（如果存在）
-        if hasattr(self, 'progress_update_id') and self.progress_update_id:
-            self.window.after_cancel(self.progress_update_id)
-            self.progress_update_id = None
-
-        if self.is_playing and not self._seek_by_user:
-            # 自增进度
-            self.current_time += 0.2  # 每200ms增加0.2秒
-            if self.total_time > 0:
-                progress = (self.current_time / self.total_time) * 100
+        """根据当前播放位置刷新进度条和时间标签，只更新显示内容有变化的控件"""
+        progress = min((self.current_time / self.total_time) * 100, 100) if self.total_time > 0 else 0
+        progress = round(progress, 1)
+        if progress != self.shown_progress:
+            self.shown_progress = progress
+            self._progress_updating = True
+            try:
                 self.progress_bar.set(progress)
-                
-                # 更新时间标签
-                current = f"{int(self.current_time)//60:02d}:{int(self.current_time)%60:02d}"
-                total = f"{self.total_time//60:02d}:{self.total_time%60:02d}"
-                self.time_label.config(text=current)
-                self.duration_label.config(text=total)
-                
-                # 如果到达结尾，触发结束事件
-                if self.current_time >= self.total_time:
-                    self.on_song_complete()
-                    return
-            
-            # 每200ms更新一次
-            self.progress_update_id = self.window.after(200, self.update_progress)
-
-    def get_current_pos(self):
-        """获取当前播放时间（秒）"""
-        if self._vlc_player:
-            return self._vlc_player.get_time() / 1000
-        return 0
+            finally:
+                self._progress_updating = False
+        time_text = format_time(self.current_time)
+        if time_text != self.shown_time:
+            self.shown_time = time_text
+            self.time_label.config(text=time_text)
+        duration_text = format_time(self.total_time)
+        if duration_text != self.shown_duration:
+            self.shown_duration = duration_text
+            self.duration_label.config(text=duration_text)
+
+    def on_playback_error(self):
+        print("VLC播放错误")
+        self.is_playing = False
+        self.play_btn.config(text="播放")
 
     def seek(self, position):
-        """跳转播放位置"""
-        if not self.vlc_process:
+        """跳转播放位置（秒），直接在当前媒体上跳转"""
+        if not self.current_file:
             return
-        
-        # 更新UI显示
+        self.engine.seek(position)
         self.current_time = position
-        if self.total_time > 0:
-            progress = (position / self.total_time) * 100
-            self.progress_bar.set(progress)
-        
-        # 停止当前播放并重新开始
-        self.stop_current_playback()
-        
-        # 使用新的起始位置重新播放
-        if self.current_file:
-            self.vlc_process = subprocess.Popen(
-                ['vlc', '--intf', 'dummy', '--play-and-exit', 
-                 '--start-time', str(position), self.current_file],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
+        self.update_progress()
+        self.update_lyrics_position()
+
+    async def fetch_song(self, song_id, with_url=True):
+        """并发获取歌曲详情、播放链接和歌词；音频已缓存时不需要播放链接，返回None"""
+        if not with_url:
+            song_detail, lyric_result = await asyncio.gather(
+                self.async_api.get_song_detail(song_id),
+                self.async_api.get_song_lyric(song_id)
             )
+            return song_detail, None, lyric_result
+        return await asyncio.gather(
+            self.async_api.get_song_detail(song_id),
+            self.async_api.get_song_url(song_id),
+            self.async_api.get_song_lyric(song_id)
+        )
 
     def load_song(self, song_id):
-        """加载歌曲"""
+        """加载歌曲，已预加载时直接播放"""
+        prefetch = self.take_prefetch(song_id)
+        if prefetch is not None:
+            self.update_song_info(prefetch.song)
+            self.play_prefetched(prefetch)
+            self.load_lyrics(song_id, prefetch.lyric_result)
+            self.current_song = prefetch.song
+            return True
         try:
-            # 获取歌曲详情
-            song_detail = self.api.get_song_detail(song_id)
+            cached = self.audio_cache.contains(song_id)
+            song_detail, url_result, lyric_result = asyncio.run(self.fetch_song(song_id, with_url=not cached))
             if song_detail.get("code") == 200 and song_detail.get("songs"):
-                song = song_detail["songs"][0]
+                # 用最新的详情更新共享的Track对象
+                song = Track.from_song(song_detail["songs"][0])
                 
                 # 更新界面信息
                 self.update_song_info(song)
                 
-                # 获取歌曲URL
-                url_result = self.api.get_song_url(song_id)
-                if url_result.get("code") == 200 and url_result["data"][0]["url"]:
-                    url = url_result["data"][0]["url"]
-                    self.play_url(url)
+                if cached or (url_result.get("code") == 200 and url_result["data"][0]["url"]):
+                    url = None if cached else url_result["data"][0]["url"]
+                    self.play_audio(song_id, url)
                     
-                    # 获取歌词
-                    self.load_lyrics(song_id)
+                    # 显示歌词
+                    self.load_lyrics(song_id, lyric_result)
                     
                     # 保存当前歌曲信息
                     self.current_song = song
@@ -434,148 +552,107 @@ class PlayerWindow:
 
     def update_song_info(self, song):
         """更新歌曲信息显示"""
-        self.title_label.config(text=song["name"])
-        artists = "/".join(ar["name"] for ar in song["ar"])
-        self.artist_label.config(text=artists)
-        self.album_label.config(text=song["al"]["name"])
+        self.title_label.config(text=song.name)
+        self.artist_label.config(text=song.artist_names)
+        self.album_label.config(text=song.album)
         
-        # 加载专辑封面
+        # 后台加载专辑封面，切歌时旧封面的请求会被取消
+        self.images.load_into(self.cover_label, song.pic_url, (250, 250), owner=self)
+
+    def play_audio(self, song_id, url=None):
+        """播放歌曲音频：已缓存时直接读本地文件，否则边下载边播放，缓冲到起播阈值后开始"""
+        self.stop_current_playback()
+        self.buffer_label.config(text="缓冲中...")
+        self.stream = self.open_stream(song_id, url, self._start_stream)
+        self.current_file = self.stream.path
+        self.stream.start()
+
+    def open_stream(self, song_id, url, on_ready):
+        """从音频缓存打开歌曲，回调在下载线程中触发，统一交回Tk线程"""
+        stream = self.audio_cache.open(
+            song_id,
+            url,
+            session=self.api.session,
+            on_ready=lambda ok: self._dispatch(on_ready, stream, ok),
+            on_progress=lambda health: self._dispatch(self.update_buffer, stream, health)
+        )
+        return stream
+
+    def play_prefetched(self, prefetch):
+        """播放预加载好的下一首，音频已在本地，媒体也已预解析"""
+        self.stop_current_playback()
+        self.stream = prefetch.stream
+        self.current_file = prefetch.stream.path
         try:
-            response = requests.get(song["al"]["picUrl"])
-            img = Image.open(BytesIO(response.content))
-            img = img.resize((250, 250))
-            photo = ImageTk.PhotoImage(img)
-            self.cover_label.config(image=photo)
-            self.cover_label.image = photo
+            self.engine.load_stream(prefetch.stream, prefetch.media)
         except Exception as e:
-            print(f"加载封面失败: {e}")
-
-    def create_temp_dir(self):
-        """创建临时文件目录"""
-        import os
-        temp_dir = "temp"
-        if not os.path.exists(temp_dir):
-            os.makedirs(temp_dir)
-        return temp_dir
-
-    def play_url(self, url):
-        """播放指定URL的音乐"""
-        try:
-            # 先停止当前播放和监控
+            print(f"播放失败: {e}")
             self.stop_current_playback()
-            if self.monitor_thread and self.monitor_thread.is_alive():
-                # 等待旧线程结束
-                self.monitor_thread.join(timeout=1.0)
-            
-            # 显示加载状态
-            original_title = self.title_label.cget('text')
-            self.title_label.config(text=f"{original_title} (下载中...)")
-            
-            # 下载音频文件到临时目录
-            temp_file = os.path.join(self.temp_dir, f"temp_music_{uuid.uuid4().hex}.mp3")
-            response = requests.get(url)
-            if response.status_code == 200:
-                with open(temp_file, "wb") as f:
-                    f.write(response.content)
-                
-                # 检查文件大小
-                if os.path.getsize(temp_file) < 1024:
-                    print("音频文件过小，可能无效")
-                    self.title_label.config(text=original_title)
-                    return
-
-                # 使用系统VLC播放
-                self.current_file = temp_file
-                self.vlc_process = subprocess.Popen(
-                    ['vlc', '--intf', 'dummy', '--play-and-exit', temp_file],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
-                
-                # 更新状态
-                self.is_playing = True
-                self.play_btn.config(text="暂停")
-                self.title_label.config(text=original_title)
-                
-                # 启动新的监控线程
-                self.monitor_thread = threading.Thread(target=self._monitor_playback)
-                self.monitor_thread.daemon = True
-                self.monitor_thread.start()
-                
-                # 重置并开始更新进度
-                self.current_time = 0
-                self.total_time = self.get_audio_duration(temp_file)
-                self.update_progress()
-                self.update_lyrics_position()
-                
+            return
+        self.is_playing = True
+        self.play_btn.config(text="暂停")
+        self.update_buffer(prefetch.stream, prefetch.stream.health())
+        self.schedule_tick()
+
+    def _start_stream(self, stream, ok):
+        """缓冲就绪后交给播放引擎，时长和进度由 tick() 读取"""
+        if stream is not self.stream:
+            return  # 已经切到别的歌
+        if not ok:
+            print(f"下载音频失败: {stream.error}")
+            self.stop_current_playback()
+            return
+        try:
+            self.engine.load_stream(stream)
         except Exception as e:
             print(f"播放失败: {e}")
             self.stop_current_playback()
-            self.title_label.config(text=original_title)
+            return
+        self.is_playing = True
+        self.play_btn.config(text="暂停")
+        self.schedule_tick()
 
-    def _monitor_playback(self):
-        """监控VLC进程状态"""
-        while self.vlc_process and self.vlc_process.poll() is None:
-            time.sleep(0.5)
-        
-        # 如果进程结束，更新UI
-        if self.is_playing:
-            self.window.after(0, self.on_song_complete)
+    def update_buffer(self, stream, health):
+        """显示缓冲进度，下载完成后隐藏"""
+        if stream is not self.stream:
+            return
+        if health["error"]:
+            text = "缓冲失败"
+        elif health["done"]:
+            text = ""
+        elif health["stalled"]:
+            text = "缓冲中..."
+        elif health["total"]:
+            text = f"缓冲 {health['downloaded'] * 100 // health['total']}%"
+        else:
+            text = f"缓冲 {health['downloaded'] // 1024}KB"
+        self.buffer_label.config(text=text)
 
     def stop_current_playback(self):
-        """停止当前播放并清理资源"""
-        # 取消进度更新定时器
-        if hasattr(self, 'progress_update_id') and self.progress_update_id:
-            self.window.after_cancel(self.progress_update_id)
-            self.progress_update_id = None
-        
-        # 停止VLC进程
-        if self.vlc_process:
-            try:
-                parent = psutil.Process(self.vlc_process.pid)
-                for child in parent.children(recursive=True):
-                    child.terminate()
-                parent.terminate()
-            except:
-                pass
-            self.vlc_process = None
+        """停止当前播放并重置状态"""
+        self.cancel_tick()
+        self.engine.stop()
+        if self.stream is not None:
+            self.stream.cancel()
+            self.stream = None
+        self.current_file = None
+        self.buffer_label.config(text="")
         
         # 重置状态
         self.is_playing = False
         self.play_btn.config(text="播放")
         self.current_time = 0
         self.total_time = 0
-        self.progress_bar.set(0)
-        self.time_label.config(text="00:00")
-        self.duration_label.config(text="00:00")
-
-    def clear_temp_files(self):
-        """清理临时文件"""
-        try:
-            for file in os.listdir(self.temp_dir):
-                file_path = os.path.join(self.temp_dir, file)
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-        except Exception as e:
-            print(f"清理临时文件失败: {e}")
+        self.update_progress()
 
     def on_closing(self):
         """窗口关闭时的处理"""
+        self.cancel_prefetch()
         self.stop_current_playback()
-        self.clear_temp_files()
+        self.engine.release()
+        self.images.cancel(self)
         self.window.destroy()
 
-    def check_music_end(self):
-        """检查音乐是否播放结束"""
-        if self._vlc_player and self.is_playing:
-            state = self._vlc_player.get_state()
-            if state == vlc.State.Ended:
-                self.on_song_complete()
-            elif state == vlc.State.Error:
-                print("VLC播放错误")
-            else:
-                self.window.after(500, self.check_music_end)
-
     def on_song_complete(self):
         """当前歌曲播放完成时的处理"""
         if self.play_mode == "single":
@@ -585,19 +662,22 @@ class PlayerWindow:
             # 播放下一首
             self.play_next()
 
-    def load_lyrics(self, song_id):
+    def load_lyrics(self, song_id, lyric_result=None):
         """加载歌词"""
         try:
             self.lyrics = []
+            self.lyric_times = []
             self.current_lyric_index = -1
             self.lyric_text.delete(1.0, tk.END)
             
-            lyric_result = self.api.get_song_lyric(song_id)
+            if lyric_result is None:
+                lyric_result = self.api.get_song_lyric(song_id)
             if lyric_result.get("code") == 200:
                 lrc = lyric_result.get("lrc", {}).get("lyric", "")
                 if lrc:
                     # 解析歌词
                     self.lyrics = self.parse_lyrics(lrc)
+                    self.lyric_times = [time for time, _ in self.lyrics]
                     # 显示歌词
                     self.show_lyrics()
                 else:
@@ -608,17 +688,7 @@ class PlayerWindow:
 
     def parse_lyrics(self, lrc_text):
         """解析歌词文本"""
-        lyrics = []
-        for line in lrc_text.split('\n'):
-            if line.strip():
-                # 匹配时间戳 [mm:ss.xx]
-                time_stamps = re.findall(r'\[(\d{2}):(\d{2})\.?\d*\]', line)
-                text = re.sub(r'\[.*?\]', '', line).strip()
-                if time_stamps and text:
-                    for minute, second in time_stamps:
-                        time_seconds = int(minute) * 60 + int(second)
-                        lyrics.append((time_seconds, text))
-        return sorted(lyrics)  # 按时间排序
+        return parse_lyrics(lrc_text)
 
     def show_lyrics(self):
         """显示歌词"""
@@ -628,25 +698,16 @@ class PlayerWindow:
             self.lyric_text.insert(tk.END, text + '\n')
 
     def update_lyrics_position(self):
-        """更新歌词位置"""
-        if not self.lyrics or not self.is_playing:
+        """根据当前播放位置更新歌词高亮"""
+        if not self.lyrics:
             return
 
         try:
-            # 使用自增的current_time来更新歌词
-            current_pos = int(self.current_time)  # 取整数部分
-            
-            # 查找当前应显示的歌词
-            for i, (time, _) in enumerate(self.lyrics):
-                if time > current_pos:
-                    if i != self.current_lyric_index:
-                        self.current_lyric_index = i - 1
-                        self.highlight_current_lyric()
-                    break
-            
-            # 安排下一次更新
-            if self.is_playing:
-                self.window.after(200, self.update_lyrics_position)
+            # 当前应显示的歌词：最后一句开始时间不晚于当前位置的歌词
+            index = bisect_right(self.lyric_times, self.current_time) - 1
+            if index != self.current_lyric_index:
+                self.current_lyric_index = index
+                self.highlight_current_lyric()
         except Exception as e:
             print(f"更新歌词位置失败: {e}")
 
@@ -668,18 +729,3 @@ class PlayerWindow:
             
             # 滚动到可见区域
             self.lyric_text.see(start)
-
-    def get_audio_duration(self, file_path):
-        """获取音频文件时长（秒）"""
-        try:
-            # 临时创建一个VLC实例来获取时长
-            instance = vlc.Instance()
-            media = instance.media_new(file_path)
-            media.parse()
-            duration = media.get_duration() // 1000  # 转换为秒
-            media.release()
-            instance.release()
-            return duration
-        except:
-            # 如果无法获取时长，返回一个默认值（如3分钟）
-            return 180
\ No newline at end of file
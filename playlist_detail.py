@@ -1,16 +1,63 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-import requests
-from io import BytesIO
+import threading
+import time
+from collections import deque
+from image_loader import ImageLoader
+from playlist_sync import PlaylistSync
+from search_index import TrackIndex, collation_key
+from track import Track
+
+# 每次插入表格的时间片，超过后让出Tk主循环处理其他事件
+INSERT_SLICE = 0.008
+# 每个时间片至少插入的行数，保证第一屏尽快出现
+MIN_INSERT_ROWS = 30
+# 可排序的列在排序键元组中的位置；点击“序号”恢复歌单原始顺序
+SORT_COLUMNS = {"歌曲": 0, "歌手": 1, "专辑": 2, "时长": 3}
+
+
+def format_row(track, number):
+    """把歌曲格式化为表格一行的值"""
+    return (number, track.name, track.artist_names, track.album, track.duration_text)
+
+
+def sort_key(track):
+    """各可排序列的排序键：文字用拼音顺序的排序键，时长用原始毫秒数"""
+    return (collation_key(track.name), collation_key(track.artist_names),
+            collation_key(track.album), track.duration_ms)
+
 
 class PlaylistDetailWindow:
-    def __init__(self, api, playlist_id):
+    def __init__(self, api, playlist_id, summary=None):
         self.window = tk.Toplevel()
         self.window.title("歌单详情")
         self.window.geometry("800x600")
         self.api = api
+        self.images = ImageLoader.get_instance()
         self.playlist_id = playlist_id
+        self.summary = summary  # 打开窗口的歌单卡片上的数据（名称、封面），用于先行显示
+        # 歌曲分页加载状态，token变化时旧的加载线程自动退出
+        self.load_token = 0
+        self.track_count = 0
+        self.track_ids = []  # 界面上歌曲的id顺序
+        self.tracks = {}  # 行id -> Track
+        self.tracks_loading = False
+        self.refreshing = False  # 刷新时的同步请求在后台线程进行中
+        self.track_total = 0  # 歌单详情中的歌曲总数，用于显示进度
+        self.sync = PlaylistSync(api)
+        self.pending_pages = threading.Semaphore(2)  # 最多积压两页未插入的数据
+        # 已格式化、等待分片插入表格的页 [(行列表, 已插入行数)]
+        self.row_queue = deque()
+        self.insert_job = None
+        self.stream_done = False
+        # 歌单内搜索
+        self.search_index = TrackIndex()
+        self.search_query = ""
+        # 列排序：排序键在后台线程格式化时预先计算
+        self.sort_keys = {}  # 歌曲id -> (歌名, 歌手, 专辑, 时长毫秒)
+        self.sort_column = None
+        self.sort_reverse = False
+        self.display_ids = None  # 排序后的顺序，None表示歌单原始顺序
         self.setup_ui()
         self.load_playlist_detail()
 
@@ -51,6 +98,14 @@ class PlaylistDetailWindow:
         )
         self.play_btn.pack(side=tk.LEFT, padx=10)
 
+        self.refresh_btn = tk.Button(
+            title_frame,
+            text="刷新",
+            command=self.refresh_playlist,
+            font=("微软雅黑", 10)
+        )
+        self.refresh_btn.pack(side=tk.LEFT)
+
         # 简介区域
         tk.Label(
             self.info_frame,
@@ -92,6 +147,23 @@ class PlaylistDetailWindow:
         )
         self.creator_name.pack(side=tk.LEFT, padx=5)
 
+        # 搜索框：输入时即时过滤歌曲列表，支持拼音首字母
+        self.search_frame = tk.Frame(self.window)
+        self.search_frame.pack(fill=tk.X, padx=20, pady=(0, 5))
+        tk.Label(self.search_frame, text="搜索：", font=("微软雅黑", 10)).pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(self.search_frame, textvariable=self.search_var, font=("微软雅黑", 10))
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
+        self.search_var.trace_add("write", self.on_search_changed)
+
+        # 加载进度
+        self.progress_frame = tk.Frame(self.window)
+        self.progress_label = tk.Label(self.progress_frame, font=("微软雅黑", 9), fg="gray")
+        self.progress_label.pack(side=tk.LEFT)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="determinate", length=200)
+        self.progress_bar.pack(side=tk.LEFT, padx=10)
+
         # 歌曲列表区域
         self.tracks_frame = tk.Frame(self.window)  # 先创建 tracks_frame
         self.tracks_frame.pack(fill=tk.BOTH, expand=True, padx=10)
@@ -115,7 +187,7 @@ class PlaylistDetailWindow:
         }
         
         for col, width in column_widths.items():
-            self.tree.heading(col, text=col)
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
             self.tree.column(col, width=width)
 
         # 添加滚动条
@@ -129,73 +201,295 @@ class PlaylistDetailWindow:
         self.tree.bind("<Double-1>", self.play_song)
 
     def load_playlist_detail(self):
+        """先显示骨架，歌单详情和歌曲列表同时在后台获取，各部分数据到达后分别填充"""
+        self.show_skeleton()
+        self.load_tracks()
+        threading.Thread(target=self._fetch_detail, args=(self.load_token,), daemon=True).start()
+
+    def show_skeleton(self):
+        """显示加载中的占位内容；打开时已知歌单名和封面（来自歌单卡片）则直接显示"""
+        summary = self.summary or {}
+        self.title_label.config(text=summary.get("name") or "加载中...")
+        self.set_description("加载中...")
+        self.creator_name.config(text="")
+        cover_url = summary.get("coverImgUrl") or summary.get("picUrl")
+        # 封面与歌单详情并行下载，不必等详情返回
+        self.images.load_into(self.cover_label, cover_url, (200, 200), owner=self)
+        self.images.load_into(self.creator_avatar, None, (30, 30), owner=self)
+
+    def set_description(self, text):
+        self.description_text.config(state="normal")
+        self.description_text.delete("1.0", tk.END)
+        self.description_text.insert("1.0", text)
+        self.description_text.config(state="disabled")
+
+    def _fetch_detail(self, token):
+        """后台线程：获取歌单详情并记录歌曲id快照，供刷新时增量同步"""
         detail = self.api.get_playlist_detail(self.playlist_id)
         if detail.get("code") == 200:
-            playlist = detail["playlist"]
-            
             try:
-                # 更新标题
-                self.window.title(playlist["name"])
-                self.title_label.config(text=playlist["name"])
-
-                # 更新描述
-                self.description_text.delete("1.0", tk.END)
-                description = playlist.get("description") or "暂无简介"
-                self.description_text.insert("1.0", description)
-                self.description_text.config(state="disabled")
-
-                # 加载歌单封面
-                if playlist.get("coverImgUrl"):
-                    response = requests.get(playlist["coverImgUrl"])
-                    img = Image.open(BytesIO(response.content))
-                    img = img.resize((200, 200))
-                    photo = ImageTk.PhotoImage(img)
-                    self.cover_label.config(image=photo)
-                    self.cover_label.image = photo
-
-                # 加载创建者头像和信息
-                creator = playlist.get("creator", {})
-                if creator.get("avatarUrl"):
-                    avatar_response = requests.get(creator["avatarUrl"])
-                    avatar_img = Image.open(BytesIO(avatar_response.content))
-                    avatar_img = avatar_img.resize((30, 30))  # 保持头像大小一致
-                    avatar_photo = ImageTk.PhotoImage(avatar_img)
-                    self.creator_avatar.config(image=avatar_photo)
-                    self.creator_avatar.image = avatar_photo
-
-                # 设置创建者名称
-                creator_name = creator.get("nickname", "未知创建者")
-                self.creator_name.config(text=creator_name)
-
+                self.sync.record(detail["playlist"])
             except Exception as e:
-                print(f"加载歌单详情失败: {e}")
+                print(f"保存歌单快照失败: {e}")
+        if token == self.load_token:
+            self.window.after(0, lambda: self.show_detail(detail, token))
+
+    def show_detail(self, detail, token):
+        """在Tk线程中填充歌单头部信息"""
+        if token != self.load_token:
+            return
+        if detail.get("code") != 200:
+            print(f"加载歌单详情失败: {detail.get('msg')}")
+            self.set_description("加载歌单详情失败")
+            return
+        playlist = detail["playlist"]
+        self.track_total = playlist.get("trackCount") or 0
+        if self.tracks_loading:
+            self.update_progress()
+
+        try:
+            # 更新标题
+            self.window.title(playlist["name"])
+            self.title_label.config(text=playlist["name"])
 
-            # 加载歌曲列表
-            self.load_tracks()
+            # 更新描述
+            self.set_description(playlist.get("description") or "暂无简介")
+
+            # 封面和创建者头像在后台加载；封面已在加载时不会重复请求
+            creator = playlist.get("creator") or {}
+            cover_url = playlist.get("coverImgUrl")
+            summary = self.summary or {}
+            if cover_url != (summary.get("coverImgUrl") or summary.get("picUrl")):
+                self.images.load_into(self.cover_label, cover_url, (200, 200), owner=self)
+            self.images.load_into(self.creator_avatar, creator.get("avatarUrl"), (30, 30), owner=self)
+
+            # 设置创建者名称
+            creator_name = creator.get("nickname", "未知创建者")
+            self.creator_name.config(text=creator_name)
+
+        except Exception as e:
+            print(f"加载歌单详情失败: {e}")
 
     def load_tracks(self):
-        """单独处理歌曲列表加载"""
+        """在后台线程分页获取歌曲，格式化后分片插入列表"""
+        self.load_token += 1
+        # 被搜索摘下的行不在 get_children() 中，按id列表删除
+        self.tree.delete(*self.track_ids)
+        self.track_count = 0
+        self.track_ids = []
+        self.tracks = {}
+        self.tracks_loading = True
+        self.stream_done = False
+        self.row_queue.clear()
+        if self.insert_job is not None:
+            self.window.after_cancel(self.insert_job)
+            self.insert_job = None
+        self.pending_pages = threading.Semaphore(2)
+        self.search_index = TrackIndex()
+        self.sort_keys = {}
+        self.display_ids = None
+        self.progress_frame.pack(fill=tk.X, padx=20, before=self.tracks_frame)
+        self.update_progress()
+        threading.Thread(
+            target=self._stream_tracks,
+            args=(self.load_token, self.pending_pages, self.search_index, self.sort_keys),
+            daemon=True
+        ).start()
+
+    def _stream_tracks(self, token, pending_pages, search_index, sort_keys):
+        """后台线程：逐页获取歌曲，格式化成表格行并计算搜索索引和排序键，再交给Tk线程插入"""
+        pages = self.api.iter_playlist_tracks(self.playlist_id)
+        number = 0
         try:
-            tracks = self.api.get_playlist_tracks(self.playlist_id)
-            if tracks.get("code") == 200:
-                # 清空现有列表
-                for item in self.tree.get_children():
-                    self.tree.delete(item)
-                
-                # 添加新的歌曲
-                for i, song in enumerate(tracks["songs"], 1):
-                    artists = "/".join(ar["name"] for ar in song["ar"])
-                    duration = f"{song['dt']//60000}:{(song['dt']//1000)%60:02d}"
-                    
-                    self.tree.insert("", "end", values=(
-                        i,
-                        song["name"],
-                        artists,
-                        song["al"]["name"],
-                        duration
-                    ), tags=(str(song["id"]),))
+            for songs in pages:
+                # 等待Tk线程消化已提交的页，避免数据在队列里堆积
+                while not pending_pages.acquire(timeout=0.5):
+                    if token != self.load_token:
+                        return
+                if token != self.load_token:
+                    return
+                rows = []
+                for song in songs:
+                    number += 1
+                    track = Track.from_song(song)
+                    song_id = str(track.id)
+                    search_index.add(song_id, track.name, track.artist_names, track.album)
+                    sort_keys[song_id] = sort_key(track)
+                    rows.append((track, format_row(track, number)))
+                self.window.after(0, lambda r=rows: self.append_tracks(r, token))
         except Exception as e:
             print(f"加载歌曲列表失败: {e}")
+        finally:
+            pages.close()
+            if token == self.load_token:
+                self.window.after(0, lambda: self.finish_tracks(token))
+
+    def finish_tracks(self, token):
+        """所有分页获取完毕，等待队列中的行插入完成"""
+        if token == self.load_token:
+            self.stream_done = True
+            self.check_tracks_done()
+
+    def check_tracks_done(self):
+        if self.stream_done and not self.row_queue:
+            self.tracks_loading = False
+            self.progress_frame.pack_forget()
+
+    def append_tracks(self, rows, token):
+        """把一页已格式化的歌曲加入插入队列"""
+        if token != self.load_token:
+            return
+        self.row_queue.append([rows, 0])
+        if self.insert_job is None:
+            self.insert_rows()
+
+    def insert_rows(self):
+        """在一个时间片内尽量多地插入行，剩余的交给下一次after()"""
+        self.insert_job = None
+        deadline = time.perf_counter() + INSERT_SLICE
+        inserted = 0
+        pages_done = 0
+        while self.row_queue:
+            page = self.row_queue[0]
+            rows, done = page
+            try:
+                while done < len(rows):
+                    track, values = rows[done]
+                    done += 1
+                    self.insert_track(track, values)
+                    inserted += 1
+                    if inserted >= MIN_INSERT_ROWS and time.perf_counter() > deadline:
+                        break
+            except Exception as e:
+                print(f"加载歌曲列表失败: {e}")
+                done = len(rows)
+            page[1] = done
+            if done < len(rows):
+                break
+            self.row_queue.popleft()
+            self.pending_pages.release()
+            pages_done += 1
+        self.update_progress()
+        # 排序和过滤要遍历全部行，每插完一页才重新应用一次，而不是每个时间片都做
+        if pages_done and (self.sort_column or self.search_query):
+            self.update_order()
+            self.apply_filter()
+        if self.row_queue:
+            self.insert_job = self.window.after(1, self.insert_rows)
+        else:
+            self.check_tracks_done()
+
+    def update_progress(self):
+        """更新加载进度"""
+        total = max(self.track_total, self.track_count)
+        if total:
+            self.progress_bar.config(maximum=total, value=self.track_count)
+            self.progress_label.config(text=f"正在加载歌曲 {self.track_count}/{total}")
+        else:
+            self.progress_label.config(text=f"正在加载歌曲 {self.track_count}")
+
+    def insert_track(self, track, values):
+        """在末尾插入一行歌曲，行id即歌曲id
+
+        有排序或搜索时先摘下新行，插完一页后由 update_order/apply_filter 按顺序挂回匹配的行。
+        """
+        song_id = str(track.id)
+        if self.tree.exists(song_id):
+            return
+        self.tree.insert("", "end", iid=song_id, values=values)
+        if self.sort_column or self.search_query:
+            self.tree.detach(song_id)
+        self.tracks[song_id] = track
+        self.track_ids.append(song_id)
+        self.track_count += 1
+
+    def apply_diff(self, result):
+        """把同步结果应用到现有列表：删除移除的，插入新增的，并按最新顺序排列"""
+        # 先挂回被搜索过滤掉的行，保证插入位置与歌单顺序一致
+        self.tree.set_children("", *self.track_ids)
+        removed = [i for i in result.removed if self.tree.exists(i)]
+        if removed:
+            self.tree.delete(*removed)
+        for song_id in removed:
+            self.tracks.pop(song_id, None)
+        added = {str(track.id): track for track in map(Track.from_song, result.added)}
+        position = 0
+        for song_id in result.track_ids:
+            if song_id in added and not self.tree.exists(song_id):
+                self.tree.insert("", position, iid=song_id,
+                                 values=format_row(added[song_id], position + 1))
+                self.tracks[song_id] = added[song_id]
+            elif self.tree.exists(song_id):
+                self.tree.move(song_id, "", position)
+                self.tree.set(song_id, "序号", position + 1)
+            else:
+                continue
+            position += 1
+        self.track_ids = [i for i in result.track_ids if self.tree.exists(i)]
+        self.track_count = len(self.track_ids)
+        # 同步搜索索引
+        for song_id in result.removed:
+            self.search_index.remove(song_id)
+        for song_id, track in added.items():
+            self.search_index.add(song_id, track.name, track.artist_names, track.album)
+            self.sort_keys[song_id] = sort_key(track)
+        if self.sort_column or self.search_query:
+            self.update_order()
+            self.apply_filter()
+
+    def on_search_changed(self, *args):
+        self.search_query = self.search_var.get().strip()
+        self.apply_filter()
+
+    def apply_filter(self):
+        """按当前排序和搜索词刷新列表：不匹配的行从表格中摘下（detach），并不删除
+
+        set_children 一次调用完成摘下和按顺序挂回，开销与行数成正比但不重建行。
+        """
+        ordered = self.display_ids if self.display_ids is not None else self.track_ids
+        matched = self.search_index.search(self.search_query)
+        if matched is None:
+            visible = ordered
+        else:
+            visible = [i for i in ordered if i in matched]
+        self.tree.set_children("", *visible)
+
+    def update_order(self):
+        """按当前排序列重新计算显示顺序，排序稳定，相同键保持歌单顺序"""
+        if self.sort_column is None:
+            self.display_ids = None
+            return
+        position = SORT_COLUMNS[self.sort_column]
+        keys = self.sort_keys
+        self.display_ids = sorted(
+            self.track_ids,
+            key=lambda i: keys[i][position],
+            reverse=self.sort_reverse
+        )
+
+    def sort_by(self, column):
+        """点击列标题排序，再次点击切换升降序，点击“序号”恢复歌单顺序
+
+        只调整行的顺序（set_children 一次完成所有移动），不删除重建，选中状态保持不变。
+        """
+        if column not in SORT_COLUMNS:
+            self.sort_column = None
+            self.sort_reverse = False
+        elif column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        for col in ("序号",) + tuple(SORT_COLUMNS):
+            arrow = ""
+            if col == self.sort_column:
+                arrow = " ▼" if self.sort_reverse else " ▲"
+            self.tree.heading(col, text=col + arrow)
+        self.update_order()
+        self.apply_filter()
+        selection = self.tree.selection()
+        if selection:
+            self.tree.see(selection[0])
 
     def play_song(self, event):
         """双击播放歌曲"""
@@ -203,14 +497,13 @@ class PlaylistDetailWindow:
         if not selection:
             return
             
-        item = selection[0]
-        song_id = self.tree.item(item, "tags")[0]
+        track = self.tracks[selection[0]]
         # 获取当前歌单所有歌曲
         all_songs = self.get_all_songs()
         # 打开播放器并设置播放列表
         from player_window import PlayerWindow
         player = PlayerWindow.get_instance(self.api)
-        player.set_playlist(all_songs, current_id=song_id)
+        player.set_playlist(all_songs, current_id=track.id)
         player.show()
 
     def play_playlist(self):
@@ -223,26 +516,48 @@ class PlaylistDetailWindow:
             player.show()
 
     def get_all_songs(self):
-        """获取歌单所有歌曲信息"""
-        songs = []
-        for item in self.tree.get_children():
-            song_id = self.tree.item(item, "tags")[0]
-            values = self.tree.item(item, "values")
-            songs.append({
-                "id": song_id,
-                "name": values[1],
-                "artist": values[2],
-                "album": values[3],
-                "duration": values[4]
-            })
-        return songs
+        """获取列表中显示的歌曲（Track列表），搜索时只包含匹配的歌曲"""
+        return [self.tracks[item] for item in self.tree.get_children()]
 
     def refresh_playlist(self):
-        """刷新歌单"""
-        self.load_playlist_detail()
+        """刷新歌单：歌单未变化时只需一次歌单详情请求，有变化时只获取新增的歌曲"""
+        if self.tracks_loading or self.refreshing:
+            return
+        self.refreshing = True
+        self.refresh_btn.config(state="disabled")
+        threading.Thread(
+            target=self._sync_tracks, args=(self.load_token, list(self.track_ids)), daemon=True
+        ).start()
+
+    def _sync_tracks(self, token, known_ids):
+        """后台线程：与服务器同步歌单，结果交给Tk线程应用"""
+        try:
+            result = self.sync.sync(self.playlist_id, known_ids=known_ids)
+        except Exception as e:
+            print(f"同步歌单失败: {e}")
+            result = None
+        if token == self.load_token:
+            self.window.after(0, lambda: self.finish_refresh(result, token))
+
+    def finish_refresh(self, result, token):
+        """在Tk线程中应用同步结果并恢复刷新按钮"""
+        if token != self.load_token:
+            return
+        self.refreshing = False
+        self.refresh_btn.config(state="normal")
+        if result is None:
+            print("同步歌单失败，重新加载")
+            self.load_playlist_detail()
+        elif result.changed:
+            self.apply_diff(result)
 
     def on_closing(self):
         """窗口关闭时的处理"""
+        self.load_token += 1  # 停止后台加载
+        if self.insert_job is not None:
+            self.window.after_cancel(self.insert_job)
+        self.images.cancel(self)
+        self.sync.close()
         self.window.destroy()
 
     def run(self):
@@ -0,0 +1,94 @@
+"""歌单增量同步：本地保存歌曲id列表快照，刷新时只获取变化的部分"""
+import json
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+
+# changed: 是否有变化; track_ids: 最新的歌曲id顺序;
+# added: 新增歌曲的详情列表; removed: 被移除的歌曲id
+SyncResult = namedtuple("SyncResult", "changed playlist track_ids added removed")
+
+
+class PlaylistSync:
+    """记录每个歌单的 trackUpdateTime 和歌曲id列表，并计算与服务器的差异"""
+
+    def __init__(self, api, path=os.path.join("cache", "playlists.db")):
+        self.api = api
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            "playlist_id TEXT PRIMARY KEY, track_update_time INTEGER, track_ids TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def load_snapshot(self, playlist_id):
+        """返回 (trackUpdateTime, [歌曲id])，没有快照时返回None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT track_update_time, track_ids FROM snapshots WHERE playlist_id = ?",
+                (str(playlist_id),)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def save_snapshot(self, playlist_id, track_update_time, track_ids):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                (str(playlist_id), track_update_time, json.dumps([str(i) for i in track_ids]))
+            )
+            self._conn.commit()
+
+    def record(self, playlist):
+        """根据 /playlist/detail 返回的歌单信息保存快照"""
+        track_ids = [t["id"] for t in playlist.get("trackIds") or []]
+        self.save_snapshot(playlist["id"], playlist.get("trackUpdateTime"), track_ids)
+
+    def sync(self, playlist_id, known_ids=None):
+        """与服务器同步，返回 SyncResult；获取歌单信息失败时返回None
+
+        known_ids 为界面上已有的歌曲id，不传时与本地快照比较。
+        没有变化时只需一次歌单详情请求。
+        """
+        detail = self.api.get_playlist_detail(playlist_id, fresh=True)
+        if detail.get("code") != 200:
+            return None
+        playlist = detail["playlist"]
+        update_time = playlist.get("trackUpdateTime")
+        track_ids = [str(t["id"]) for t in playlist.get("trackIds") or []]
+
+        snapshot = self.load_snapshot(playlist_id)
+        if known_ids is not None:
+            base_ids = [str(i) for i in known_ids]
+        elif snapshot is not None:
+            base_ids = snapshot[1]
+        else:
+            base_ids = []
+
+        if snapshot is not None and snapshot[0] == update_time and base_ids == snapshot[1]:
+            return SyncResult(False, playlist, track_ids, [], [])
+
+        base = set(base_ids)
+        current = set(track_ids)
+        added_ids = [i for i in track_ids if i not in base]
+        removed = [i for i in base_ids if i not in current]
+        added = []
+        if added_ids:
+            result = self.api.get_song_details(added_ids)
+            if result.get("code") != 200:
+                return None
+            added = result["songs"]
+
+        self.save_snapshot(playlist_id, update_time, track_ids)
+        changed = bool(added or removed) or track_ids != base_ids
+        return SyncResult(changed, playlist, track_ids, added, removed)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,99 @@
+"""客户端限流：令牌桶限速 + AIMD 自适应并发限制"""
+import threading
+import time
+
+
+class TokenBucket:
+    """令牌桶，rate为每秒补充的令牌数，capacity为允许的突发量"""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited = 0.0  # 累计等待时间（秒）
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def acquire(self, tokens=1):
+        """取得令牌，不足时阻塞等待，返回本次等待的秒数"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.waited += waited
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class AdaptiveLimiter:
+    """AIMD 并发限制
+
+    请求成功且延迟低于目标时并发上限加性增长（每个窗口约+1），
+    出现错误、限流响应或延迟超标时乘性减小，减小后冷却一段时间再允许下一次减小。
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=32,
+                 latency_target=1.0, decrease_factor=0.5, cooldown=1.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown  # 两次减小之间的最短间隔（秒）
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, latency, ok=True):
+        """归还并发名额，并根据本次请求的结果调整上限"""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if not ok or latency > self.latency_target:
+                if now - self._last_decrease > self.cooldown:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class RateLimiter:
+    """按接口类别限速，并对所有请求做自适应并发控制"""
+
+    def __init__(self, rates, concurrency=None):
+        # rates: {类别: (每秒请求数, 突发容量)}，必须包含 "default"
+        self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in rates.items()}
+        self.concurrency = concurrency or AdaptiveLimiter()
+
+    def acquire(self, category):
+        bucket = self.buckets.get(category) or self.buckets["default"]
+        bucket.acquire()
+        self.concurrency.acquire()
+
+    def release(self, latency, ok=True):
+        self.concurrency.release(latency, ok)
+
+    def stats(self):
+        return {
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "throttled_seconds": {
+                name: round(bucket.waited, 3) for name, bucket in self.buckets.items()
+            }
+        }
@@ -0,0 +1,130 @@
+"""歌单内搜索：按歌名、歌手、专辑建立二元组倒排索引，支持子串和拼音首字母匹配"""
+import threading
+from bisect import bisect_right
+from functools import lru_cache
+
+# GB2312一级汉字按拼音排序，用每个声母第一个汉字的区位码作为分界
+_GB2312_INITIALS = (
+    (-20319, "a"), (-20283, "b"), (-19775, "c"), (-19218, "d"), (-18710, "e"),
+    (-18526, "f"), (-18239, "g"), (-17922, "h"), (-17417, "j"), (-16474, "k"),
+    (-16212, "l"), (-15640, "m"), (-15165, "n"), (-14922, "o"), (-14914, "p"),
+    (-14630, "q"), (-14149, "r"), (-14090, "s"), (-13318, "t"), (-12838, "w"),
+    (-12556, "x"), (-11847, "y"), (-11055, "z")
+)
+_GB2312_LAST = -10247
+_BOUNDARIES = [boundary for boundary, _ in _GB2312_INITIALS]
+
+
+@lru_cache(maxsize=8192)
+def pinyin_initial(char):
+    """汉字的拼音首字母，非GB2312一级汉字返回None"""
+    try:
+        encoded = char.encode("gb2312")
+    except UnicodeEncodeError:
+        return None
+    if len(encoded) != 2:
+        return None
+    code = encoded[0] * 256 + encoded[1] - 65536
+    if code < _GB2312_INITIALS[0][0] or code > _GB2312_LAST:
+        return None
+    return _GB2312_INITIALS[bisect_right(_BOUNDARIES, code) - 1][1]
+
+
+def pinyin_initials(text):
+    """把文本中的汉字替换为拼音首字母，其他字符转小写保留，如 "Jay周杰伦" -> "jayzjl" """
+    result = []
+    for char in text.lower():
+        if char > "\x7f":
+            initial = pinyin_initial(char)
+            if initial:
+                result.append(initial)
+                continue
+        result.append(char)
+    return "".join(result)
+
+
+def collation_key(text):
+    """排序键：GB18030编码与GB2312兼容，一级汉字按拼音顺序排列，英文不区分大小写"""
+    return text.casefold().encode("gb18030", errors="replace")
+
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class TrackIndex:
+    """歌单搜索索引
+
+    每首歌的歌名、歌手、专辑拼成一段文本（字段间用换行分隔，查询词不会跨字段匹配），
+    连同其拼音首字母版本一起按单字和二元组建立倒排表。查询时先取各二元组倒排表的交集，
+    再对候选做子串校验。可在后台线程逐页添加，添加和查询都加锁。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = []       # 下标 -> 歌曲id
+        self._texts = []     # 下标 -> (文本, 拼音首字母)
+        self._positions = {}  # 歌曲id -> 下标
+        self._postings = {}  # 单字或二元组 -> {下标}
+        self._removed = set()
+
+    def __len__(self):
+        return len(self._ids) - len(self._removed)
+
+    def add(self, song_id, name, artists, album):
+        text = "\n".join((name, artists, album)).lower()
+        initials = pinyin_initials(text)
+        with self._lock:
+            if song_id in self._positions:
+                self._removed.discard(self._positions[song_id])
+                return
+            index = len(self._ids)
+            self._ids.append(song_id)
+            self._texts.append((text, initials))
+            self._positions[song_id] = index
+            grams = _bigrams(text) | _bigrams(initials) | set(text) | set(initials)
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = set()
+                posting.add(index)
+
+    def remove(self, song_id):
+        with self._lock:
+            index = self._positions.get(song_id)
+            if index is not None:
+                self._removed.add(index)
+
+    def search(self, query):
+        """返回匹配的歌曲id集合，空查询返回None；多个关键词以空格分隔，需全部匹配"""
+        terms = query.lower().split()
+        if not terms:
+            return None
+        with self._lock:
+            matched = None
+            for term in terms:
+                candidates = self._match_term(term, matched)
+                matched = candidates if matched is None else matched & candidates
+                if not matched:
+                    return set()
+            return {self._ids[i] for i in matched - self._removed}
+
+    def _match_term(self, term, within):
+        grams = _bigrams(term) if len(term) > 1 else {term}
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        candidates = set(postings[0]) if within is None else postings[0] & within
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                return candidates
+        if len(term) <= 2:
+            # 单字和二元组的倒排表本身就是精确结果
+            return candidates
+        texts = self._texts
+        return {i for i in candidates if term in texts[i][0] or term in texts[i][1]}
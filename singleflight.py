@@ -0,0 +1,59 @@
+"""合并并发的相同请求：同一时刻只有一个真正在执行，其余调用方共享结果"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """按key去重的在途请求表，线程安全"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.requests = 0   # 调用总数
+        self.collapsed = 0  # 被合并、没有实际执行的调用数
+
+    def do(self, key, fn):
+        """执行fn()，若相同key的调用正在进行则等待并共享其结果"""
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.collapsed += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "collapsed": self.collapsed,
+            "in_flight": self.in_flight()
+        }
@@ -0,0 +1,220 @@
+"""边下载边播放：后台线程分块把音频写入文件，播放端按需读取，数据未到时阻塞等待"""
+import logging
+import os
+import threading
+import time
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# 缓冲到这么多字节就开始播放
+START_THRESHOLD = 256 * 1024
+# 缓冲进度回调的最小间隔（秒）
+PROGRESS_INTERVAL = 0.25
+
+
+class StreamBuffer:
+    """把一个音频URL下载到本地文件
+
+    内存中最多只有一个分块；读取端（StreamReader）从同一个文件读取已下载的部分。
+    resume=True 时已有的文件视为上次中断的下载，用Range请求从末尾续传。
+    previous 为同一文件上一次的下载，先等它的下载线程退出再开始；它已完整时直接使用它的文件。
+    on_ready(ok) 在缓冲达到起播阈值、下载完成或失败时调用一次；
+    on_progress(health) 在下载过程中定期调用；on_finish(stream) 在下载线程退出前调用，
+    此时 done 为True表示文件已完整。回调都在下载线程中执行。
+    """
+
+    def __init__(self, url, path, session=None, chunk_size=CHUNK_SIZE,
+                 start_threshold=START_THRESHOLD, on_ready=None, on_progress=None,
+                 on_finish=None, resume=False, timeout=(3.05, 30), previous=None):
+        self.url = url
+        self.path = path
+        self.session = session
+        self.chunk_size = chunk_size
+        self.start_threshold = start_threshold
+        self.on_ready = on_ready
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self.resume = resume
+        self.timeout = timeout
+        self.previous = previous
+        self.total = None  # 未知时为None
+        self.downloaded = 0
+        self.done = False
+        self.error = None
+        self.cancelled = False
+        self.waiting = 0  # 正在等待数据的读取端数量，大于0表示播放追上了下载
+        self.cond = threading.Condition()
+        self._ready_sent = False
+        self._thread = None
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """已经完整下载的文件，start() 时直接就绪，不需要网络"""
+        stream = cls(None, path, **kwargs)
+        stream.total = stream.downloaded = os.path.getsize(path)
+        stream.done = True
+        return stream
+
+    def start(self):
+        if self.done:
+            self._ready(True)
+            self._report()
+            return self
+        self._thread = threading.Thread(target=self._download, daemon=True, name="audio-stream")
+        self._thread.start()
+        return self
+
+    def join(self, timeout=None):
+        """等待下载线程退出"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _download(self):
+        last_report = 0.0
+        http = self.session or requests
+        try:
+            previous, self.previous = self.previous, None
+            if previous is not None:
+                previous.join()
+                if self.cancelled:
+                    return
+                if previous.done:
+                    self.path = previous.path
+                    with self.cond:
+                        self.total = self.downloaded = previous.downloaded
+                        self.done = True
+                        self.cond.notify_all()
+                    self._ready(True)
+                    return
+            offset = os.path.getsize(self.path) if self.resume and os.path.exists(self.path) else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else None
+            with http.get(self.url, stream=True, timeout=self.timeout, headers=headers) as response:
+                # 416 表示续传的文件其实已经完整
+                complete = offset > 0 and response.status_code == 416
+                if not complete:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        offset = 0  # 服务器不支持续传，从头下载
+                    length = response.headers.get("Content-Length")
+                    self.total = offset + int(length) if length else None
+                else:
+                    self.total = offset
+                with self.cond:
+                    self.downloaded = offset
+                    self.cond.notify_all()
+                if offset >= self.start_threshold:
+                    self._ready(True)
+                with open(self.path, "ab" if offset else "wb") as f:
+                    for chunk in () if complete else response.iter_content(self.chunk_size):
+                        if self.cancelled:
+                            return
+                        f.write(chunk)
+                        f.flush()
+                        with self.cond:
+                            self.downloaded += len(chunk)
+                            self.cond.notify_all()
+                        if self.downloaded >= self.start_threshold:
+                            self._ready(True)
+                        now = time.monotonic()
+                        if now - last_report >= PROGRESS_INTERVAL:
+                            last_report = now
+                            self._report()
+            with self.cond:
+                self.done = True
+                self.cond.notify_all()
+            self._ready(self.downloaded > 0)
+        except Exception as e:
+            logger.warning("下载音频失败 %s: %s", self.url, e)
+            with self.cond:
+                self.error = e
+                self.cond.notify_all()
+            self._ready(False)
+        finally:
+            if self.on_finish:
+                self.on_finish(self)
+            self._report()
+
+    def _ready(self, ok):
+        if not self._ready_sent:
+            self._ready_sent = True
+            if self.on_ready and not self.cancelled:
+                self.on_ready(ok)
+
+    def _report(self):
+        if self.on_progress and not self.cancelled:
+            self.on_progress(self.health())
+
+    def health(self):
+        """缓冲状态：已下载字节、总字节、是否完成、是否正在等待数据"""
+        return {
+            "downloaded": self.downloaded,
+            "total": self.total,
+            "done": self.done,
+            "error": str(self.error) if self.error else None,
+            "stalled": self.waiting > 0 and not self.done
+        }
+
+    def cancel(self):
+        """停止下载并唤醒所有等待数据的读取端"""
+        with self.cond:
+            self.cancelled = True
+            self.cond.notify_all()
+
+    def reader(self):
+        return StreamReader(self)
+
+
+class StreamReader:
+    """从 StreamBuffer 的文件中顺序或随机读取，所需数据还没下载时阻塞"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+        self.closed = False
+        self._file = None
+
+    def read(self, size):
+        """读取最多size字节；返回b""表示结束，None表示出错或已关闭"""
+        stream = self.stream
+        with stream.cond:
+            stream.waiting += 1
+            try:
+                while (not self.closed and not stream.cancelled and stream.error is None
+                       and not stream.done and self.position >= stream.downloaded):
+                    stream.cond.wait(0.5)
+            finally:
+                stream.waiting -= 1
+            if self.closed or stream.cancelled or stream.error is not None:
+                return None
+            available = stream.downloaded - self.position
+            if available <= 0:
+                return b""
+            try:
+                if self._file is None:
+                    # 在锁内打开：下载完成后文件可能被改名，path 和改名在同一把锁下更新
+                    self._file = open(stream.path, "rb")
+                self._file.seek(self.position)
+                data = self._file.read(min(size, available))
+            except OSError as e:
+                logger.warning("读取音频失败 %s: %s", stream.path, e)
+                return None
+        self.position += len(data)
+        return data
+
+    def seek(self, offset):
+        self.position = offset
+
+    def close(self):
+        """关闭读取端，正在阻塞的 read() 会立即返回；可在任意线程调用"""
+        with self.stream.cond:
+            self.closed = True
+            self.stream.cond.notify_all()
+
+    def release(self):
+        """释放文件句柄，只能在读取线程中调用"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,37 @@
+"""用模拟服务器验证 AsyncNetEaseAPI 的请求确实并发执行"""
+import asyncio
+import time
+
+from api import NetEaseAPI, AsyncNetEaseAPI
+from mock_server import MockServer
+
+LATENCY = 0.2
+
+
+async def gather_song(async_api, song_id):
+    return await asyncio.gather(
+        async_api.get_song_detail(song_id),
+        async_api.get_song_url(song_id),
+        async_api.get_song_lyric(song_id)
+    )
+
+
+def test_song_requests_overlap():
+    with MockServer(latency=LATENCY) as server:
+        api = NetEaseAPI(base_url=server.base_url, cache=False)
+        async_api = AsyncNetEaseAPI(api)
+        try:
+            # 先跑一轮建立连接池中的连接，只测量请求本身的重叠
+            asyncio.run(gather_song(async_api, 2))
+            start = time.perf_counter()
+            detail, url, lyric = asyncio.run(gather_song(async_api, 1))
+            elapsed = time.perf_counter() - start
+        finally:
+            async_api.close()
+            api.close()
+
+    assert detail["code"] == 200 and detail["songs"][0]["id"] == 1
+    assert url["code"] == 200 and url["data"][0]["url"]
+    assert lyric["code"] == 200
+    # 三个请求依次执行至少需要 3 * LATENCY，并发时接近一个 LATENCY
+    assert elapsed < 2 * LATENCY
@@ -0,0 +1,55 @@
+"""歌曲数据模型：各窗口共享同一个 Track 对象，而不是各自保存一份字典"""
+import sys
+import threading
+import weakref
+
+
+class Track:
+    """一首歌曲，只保存界面需要的字段"""
+    __slots__ = ("id", "name", "artists", "album", "pic_url", "duration_ms", "__weakref__")
+
+    def __init__(self, id, name, artists=(), album="", pic_url=None, duration_ms=0):
+        self.id = id
+        self.name = name
+        self.artists = artists  # 歌手名元组
+        self.album = album
+        self.pic_url = pic_url
+        self.duration_ms = duration_ms
+
+    def __repr__(self):
+        return f"Track({self.id}, {self.name!r})"
+
+    @property
+    def artist_names(self):
+        return "/".join(self.artists)
+
+    @property
+    def duration_text(self):
+        """m:ss 格式的时长"""
+        return f"{self.duration_ms // 60000}:{(self.duration_ms // 1000) % 60:02d}"
+
+    def update(self, song):
+        """用接口返回的歌曲数据更新字段；歌手和专辑名大量重复，做字符串驻留"""
+        album = song.get("al") or {}
+        self.name = song.get("name") or ""
+        self.artists = tuple(sys.intern(ar.get("name") or "") for ar in song.get("ar") or ())
+        self.album = sys.intern(album.get("name") or "")
+        self.pic_url = album.get("picUrl")
+        self.duration_ms = song.get("dt") or 0
+
+    @classmethod
+    def from_song(cls, song):
+        """把接口返回的歌曲字典转换为 Track，同一首歌始终返回同一个对象"""
+        song_id = int(song["id"])
+        with _lock:
+            track = _tracks.get(song_id)
+            if track is None:
+                track = cls(song_id, "")
+                _tracks[song_id] = track
+        track.update(song)
+        return track
+
+
+# 歌曲id -> Track 的身份映射，没有窗口再引用的歌曲会被自动回收
+_tracks = weakref.WeakValueDictionary()
+_lock = threading.Lock()